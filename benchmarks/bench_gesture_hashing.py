@@ -0,0 +1,46 @@
+# Throughput comparison of the per-frame and batch gesture hashing paths.
+# Run from the repo root: python -m benchmarks.bench_gesture_hashing [num_frames]
+import sys
+import time
+from collections import namedtuple
+
+from hands.detectors import make_synthetic_poses
+from hands.gesture_conversions import get_gesture_hash, get_gesture_hashes_batch
+
+# Stand-in for a MediaPipe NormalizedLandmark (only .x/.y/.z are used)
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+
+SALTS = ["user1", "admin", "bob", ""]
+
+
+def to_landmark_objects(landmarks):
+    return [[Landmark(*map(float, point)) for point in frame] for frame in landmarks]
+
+
+def main():
+    num_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    landmarks = make_synthetic_poses(num_frames)
+    salts = [SALTS[i % len(SALTS)] for i in range(num_frames)]
+    frames = to_landmark_objects(landmarks)
+
+    start = time.perf_counter()
+    per_frame = [get_gesture_hash(frame, salt=salt) for frame, salt in zip(frames, salts)]
+    per_frame_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = get_gesture_hashes_batch(landmarks, salts)
+    batch_time = time.perf_counter() - start
+
+    if per_frame != batch:
+        mismatches = sum(a != b for a, b in zip(per_frame, batch))
+        print(f"ERROR: {mismatches}/{num_frames} batch hashes differ from get_gesture_hash")
+        sys.exit(1)
+
+    print(f"Hashed {num_frames} frames, batch output identical to get_gesture_hash")
+    print(f"per-frame: {num_frames / per_frame_time:12.0f} frames/s ({per_frame_time:.3f}s)")
+    print(f"batch:     {num_frames / batch_time:12.0f} frames/s ({batch_time:.3f}s)")
+    print(f"speedup:   {per_frame_time / batch_time:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Timing, memory and baseline comparison helpers for the benchmark suite.
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+# A benchmark regresses when its median latency gets this much worse. Only
+# the median is checked: throughput and p99 swing with machine load.
+DEFAULT_THRESHOLD = 0.2
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark's setup when it cannot run here (missing model, video, ...)."""
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, iterations, warmup=3):
+    """
+    Call func() iterations times and return ops/sec, p50/p99 latency (ms) and
+    peak traced memory (KiB). Memory is traced in a separate pass so the
+    tracemalloc overhead doesn't skew the timings.
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        op_start = time.perf_counter_ns()
+        func()
+        latencies.append((time.perf_counter_ns() - op_start) / 1e6)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, 10)):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies),
+        "peak_kib": peak / 1024,
+    }
+
+
+def load_baseline(path):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results saved to {path}")
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return a list of (name, message) for benchmarks that regressed against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        if result["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append((name, f"p50 {previous['p50_ms']:.3f}ms -> {result['p50_ms']:.3f}ms"))
+    return regressions
+
+
+def format_table(results, baseline):
+    lines = [f"{'benchmark':<42} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KiB':>10} {'p50 vs base':>12}"]
+    for name, result in results.items():
+        previous = baseline.get(name)
+        change = ""
+        if previous:
+            change = f"{result['p50_ms'] / previous['p50_ms'] - 1:+.0%}" if previous["p50_ms"] else ""
+        lines.append(
+            f"{name:<42} {result['ops_per_sec']:>12.1f} {result['p50_ms']:>10.3f} "
+            f"{result['p99_ms']:>10.3f} {result['peak_kib']:>10.1f} {change:>12}"
+        )
+    return "\n".join(lines)
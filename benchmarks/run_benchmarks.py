@@ -0,0 +1,397 @@
+# Benchmark suite for the hashing, tracking, database, preview and frame ring hot paths.
+# Runs headless, without a camera. From the repo root:
+#   python -m benchmarks.run_benchmarks                  compare against benchmarks/baseline.json
+#   python -m benchmarks.run_benchmarks --update-baseline
+#   python -m benchmarks.run_benchmarks --filter db.
+import argparse
+import atexit
+import glob
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from hands.detectors import make_synthetic_poses
+
+from .harness import (
+    DEFAULT_THRESHOLD,
+    SkipBenchmark,
+    compare,
+    format_table,
+    load_baseline,
+    measure,
+    save_results,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+VIDEO_GLOB = os.path.join(REPO_ROOT, "videos", "*.mp4")
+
+# Frames decoded from each demo video for the replay benchmark
+VIDEO_FRAMES_PER_FILE = 30
+
+# Times a regressed benchmark is run again; it is only reported if it
+# regresses every time, so one noisy run doesn't fail the suite
+RECHECK_RUNS = 2
+
+
+def import_hand_tracker():
+    # hand_tracker sets up MediaPipe Hands at import time; only the MediaPipe
+    # benchmarks need it, the hashing path is in gesture_pipeline
+    try:
+        from hands import hand_tracker
+    except (ImportError, AttributeError) as e:
+        raise SkipBenchmark(f"MediaPipe Hands unavailable: {e}")
+    return hand_tracker
+
+
+# --- gesture_conversions on synthetic landmarks ---
+
+def setup_gesture_hash():
+    from hands.gesture_conversions import get_gesture_hash
+    from hands.landmark_frame import LandmarkFrame
+
+    frames = itertools.cycle([LandmarkFrame(points) for points in make_synthetic_poses(256)])
+    return lambda: get_gesture_hash(next(frames), salt="user1")
+
+
+def setup_gesture_hashes_batch():
+    from hands.gesture_conversions import get_gesture_hashes_batch
+
+    landmarks = make_synthetic_poses(1000)
+    return lambda: get_gesture_hashes_batch(landmarks, "user1")
+
+
+def setup_classify_gesture():
+    from hands.gesture_pipeline import classify_gesture
+    from hands.landmark_frame import LandmarkFrame
+
+    frames = itertools.cycle([LandmarkFrame(points) for points in make_synthetic_poses(256)])
+    return lambda: classify_gesture(next(frames))
+
+
+def setup_gesture_memo_still():
+    # A held pose: small jitter around one set of landmarks, as from a steady hand
+    from hands.gesture_memo import GestureMemo
+    from hands.landmark_frame import LandmarkFrame
+
+    rng = np.random.default_rng(0)
+    points = make_synthetic_poses(1)[0]
+    frames = itertools.cycle([LandmarkFrame(points + rng.normal(0, 0.0005, points.shape)) for _ in range(256)])
+    memo = GestureMemo(salt="user1")
+    return lambda: memo.lookup(next(frames))
+
+
+def setup_gesture_index_match():
+    from hands.gesture_conversions import get_gesture_features_and_template, hash_gesture_features
+    from hands.gesture_index import GestureIndex
+    from hands.landmark_frame import LandmarkFrame
+
+    frames = [LandmarkFrame(points) for points in make_synthetic_poses(1000)]
+    registered = {}
+    for i, frame in enumerate(frames):
+        features, template = get_gesture_features_and_template(frame)
+        registered[f"gesture{i}"] = {"hash": hash_gesture_features(features, "user1"), "template": template}
+    index = GestureIndex.from_registered(registered)
+
+    queries = itertools.cycle([(entry["hash"], entry["template"]) for entry in registered.values()])
+    return lambda: index.match(*next(queries))
+
+
+# --- process_image_with_frame replayed over the demo videos ---
+
+def load_video_frames():
+    import cv2
+
+    frames = []
+    for path in sorted(glob.glob(VIDEO_GLOB)):
+        capture = cv2.VideoCapture(path)
+        for _ in range(VIDEO_FRAMES_PER_FILE):
+            success, frame = capture.read()
+            if not success:
+                break
+            frames.append(frame)
+        capture.release()
+    return frames
+
+
+def setup_process_image_with_frame(render="none"):
+    def setup():
+        process_image_with_frame = import_hand_tracker().process_image_with_frame
+
+        frames = load_video_frames()
+        if not frames:
+            raise SkipBenchmark(f"No frames decoded from {VIDEO_GLOB}")
+        frames = itertools.cycle(frames)
+        return lambda: process_image_with_frame(next(frames), "user1", render=render)
+    return setup
+
+
+def setup_roi_tracking(mode):
+    # The live tracker's inference per frame: "full" frames, ROI crops that
+    # follow the hand in "static" image mode, or steady ROI crops in "tracking" mode
+    def setup():
+        mp_hands = import_hand_tracker().mp_hands
+        from hands.roi_tracker import RoiTracker
+
+        frames = load_video_frames()
+        if not frames:
+            raise SkipBenchmark(f"No frames decoded from {VIDEO_GLOB}")
+        frames = itertools.cycle(frames)
+        tracker = RoiTracker(enabled=mode != "full", tracking=mode != "static")
+        hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7,
+                               **tracker.hands_options())
+        atexit.register(hands.close)
+        return lambda: tracker.process(hands, next(frames))
+    return setup
+
+
+def setup_process_image_with_frame_fake():
+    # Everything around the model: frame prep, hashing and result building
+    from hands.detectors import FakeHandDetector
+    from hands.gesture_pipeline import process_image_with_frame
+
+    detector = FakeHandDetector()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    return lambda: process_image_with_frame(frame, "user1", detector=detector)
+
+
+def setup_evaluate_burst_fake():
+    from hands import burst_auth
+    from hands.detectors import set_hand_detector_backend
+
+    # Recreate the burst workers with fake detectors, then restore the default backend
+    burst_auth.release_burst_workers()
+    set_hand_detector_backend("fake")
+    try:
+        for future in burst_auth.warm_up_burst_workers():
+            future.result()
+    finally:
+        set_hand_detector_backend(None)
+    atexit.register(burst_auth.release_burst_workers)
+
+    frames = [np.zeros((480, 640, 3), dtype=np.uint8)] * burst_auth.BURST_SIZE
+    return lambda: burst_auth.evaluate_burst(frames, "user1")
+
+
+def setup_hand_detector_cold():
+    HandDetectorService = import_hand_tracker().HandDetectorService
+
+    def cold_start():
+        detector = HandDetectorService()
+        detector.warm_up()
+        detector.close()
+    return cold_start
+
+
+def setup_hand_detector_warm():
+    detector = import_hand_tracker().HandDetectorService()
+    detector.warm_up()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    return lambda: detector.process(frame)
+
+
+# --- db/handle_db.py against a scratch database ---
+
+def use_scratch_db(num_users=1000):
+    from db import handle_db
+
+    scratch_dir = tempfile.mkdtemp(prefix="bench_db_")
+    atexit.register(shutil.rmtree, scratch_dir, True)
+    handle_db.DB_PATH = os.path.join(scratch_dir, "password_manager.db")
+    handle_db.init_db()
+
+    template = [3, 5, 5, 6, 2, 4, 1, 1] + [12, 0, 12, 0, 12]
+    for i in range(num_users):
+        handle_db.insert_user(f"user{i}", format(i, "x"), template)
+    return handle_db, [f"user{i}" for i in range(num_users)]
+
+
+def setup_db_insert_user():
+    handle_db, _ = use_scratch_db(num_users=0)
+    counter = itertools.count()
+    template = [3, 5, 5, 6, 2, 4, 1, 1] + [12, 0, 12, 0, 12]
+    return lambda: handle_db.insert_user(f"new_user{next(counter)}", "deadbeef", template)
+
+
+def setup_db_get_user():
+    handle_db, usernames = use_scratch_db()
+    names = itertools.cycle(usernames)
+    return lambda: handle_db.get_user(next(names))
+
+
+def setup_db_retrieve_password():
+    handle_db, usernames = use_scratch_db()
+    names = itertools.cycle(usernames)
+    return lambda: handle_db.retrieve_password(next(names))
+
+
+def setup_db_retrieve_template():
+    handle_db, usernames = use_scratch_db()
+    names = itertools.cycle(usernames)
+    return lambda: handle_db.retrieve_template(next(names))
+
+
+def use_scratch_vault(num_entries=10000):
+    handle_db, _ = use_scratch_db(num_users=0)
+    handle_db.insert_vault_entries("owner", ((f"account{i}@site{i % 100}.com", f"secret{i}")
+                                             for i in range(num_entries)))
+    return handle_db
+
+
+def setup_db_fetch_vault_page():
+    handle_db = use_scratch_vault()
+    # Pages from anywhere in the vault, as the view scrolls
+    after_ids = itertools.cycle(range(0, 10000, 200))
+    return lambda: handle_db.fetch_vault_page("owner", next(after_ids), 200)
+
+
+def setup_db_search_vault():
+    handle_db = use_scratch_vault()
+    return lambda: handle_db.fetch_vault_page("owner", 0, 200, "site42.com")
+
+
+def setup_vault_model_open():
+    use_scratch_vault()
+    from client.vault_model import VaultTableModel
+
+    # Switching owner resets the model and reads its first page and a screenful of passwords
+    model = VaultTableModel()
+
+    def open_vault():
+        model.set_owner("owner")
+        for row in range(0, 20):
+            model.data(model.index(row, 1))
+    return open_vault
+
+
+# --- camera frame to preview image ---
+
+def setup_preview_render(width, height):
+    def setup():
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtWidgets import QApplication
+        from client.preview_renderer import PreviewRenderer
+
+        # Keep a reference so the application outlives the benchmark
+        setup.app = QApplication.instance() or QApplication([])
+        frame = np.random.default_rng(0).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        renderer = PreviewRenderer(480, 320)
+        return lambda: renderer.render(frame)
+    return setup
+
+
+# --- shared-memory frame ring ---
+
+def setup_frame_ring(operation):
+    def setup():
+        from camera.frame_ring import FrameRing
+
+        ring = FrameRing.create((480, 640, 3))
+        atexit.register(ring.close)
+        frame = np.random.default_rng(0).integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+        ring.write(frame)
+        if operation == "write":
+            return lambda: ring.write(frame)
+        return lambda: ring.latest()
+    return setup
+
+
+# (name, setup, iterations)
+BENCHMARKS = [
+    ("hashing.get_gesture_hash", setup_gesture_hash, 2000),
+    ("hashing.get_gesture_hashes_batch[1000]", setup_gesture_hashes_batch, 200),
+    ("hashing.classify_gesture", setup_classify_gesture, 5000),
+    ("hashing.gesture_memo[still]", setup_gesture_memo_still, 5000),
+    ("hashing.gesture_index_match[1000]", setup_gesture_index_match, 2000),
+    ("tracking.process_image_with_frame[videos]", setup_process_image_with_frame(), 60),
+    ("tracking.process_image_with_frame[videos,hud]", setup_process_image_with_frame("hud"), 60),
+    ("tracking.roi[videos,full]", setup_roi_tracking("full"), 90),
+    ("tracking.roi[videos,static]", setup_roi_tracking("static"), 90),
+    ("tracking.roi[videos,tracking]", setup_roi_tracking("tracking"), 90),
+    ("tracking.process_image_with_frame[fake]", setup_process_image_with_frame_fake, 2000),
+    ("auth.evaluate_burst[fake]", setup_evaluate_burst_fake, 1000),
+    ("tracking.hand_detector[cold]", setup_hand_detector_cold, 10),
+    ("tracking.hand_detector[warm]", setup_hand_detector_warm, 60),
+    ("db.insert_user", setup_db_insert_user, 300),
+    ("db.get_user", setup_db_get_user, 1000),
+    ("db.retrieve_password", setup_db_retrieve_password, 1000),
+    ("db.retrieve_template", setup_db_retrieve_template, 1000),
+    ("db.fetch_vault_page[10000]", setup_db_fetch_vault_page, 1000),
+    ("db.fetch_vault_page[10000,search]", setup_db_search_vault, 1000),
+    ("gui.vault_model_open[10000]", setup_vault_model_open, 300),
+    ("gui.preview_render[640x480]", setup_preview_render(640, 480), 300),
+    ("gui.preview_render[1280x720]", setup_preview_render(1280, 720), 200),
+    ("camera.frame_ring.write[640x480]", setup_frame_ring("write"), 2000),
+    ("camera.frame_ring.latest", setup_frame_ring("latest"), 5000),
+]
+
+
+def run(name_filter=None, scale=1.0, names=None):
+    results = {}
+    for name, setup, iterations in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        if names is not None and name not in names:
+            continue
+        try:
+            func = setup()
+        except SkipBenchmark as e:
+            print(f"SKIP {name}: {e}")
+            continue
+        print(f"Running {name}...")
+        results[name] = measure(func, max(1, int(iterations * scale)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gesture auth hot paths.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark is flagged (0.2 = 20%%)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every iteration count")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--rechecks", type=int, default=RECHECK_RUNS,
+                        help="re-runs a regression must fail too before it is reported")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.scale)
+    baseline = load_baseline(args.baseline)
+
+    print()
+    print(format_table(results, baseline))
+
+    if args.output:
+        save_results(results, args.output)
+
+    if args.update_baseline:
+        # Keep entries for benchmarks that were filtered out or skipped on this machine
+        baseline.update(results)
+        save_results(baseline, args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(args.rechecks):
+        if not regressions:
+            break
+        names = {name for name, _ in regressions}
+        print(f"\nRe-running {len(names)} regressed benchmark(s)...")
+        still_regressed = {name for name, _ in compare(run(names=names, scale=args.scale), baseline, args.threshold)}
+        regressions = [(name, message) for name, message in regressions if name in still_regressed]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for name, message in regressions:
+            print(f"  {name}: {message}")
+        return 1
+
+    print("\nNo regressions against baseline" if baseline else "\nNo baseline to compare against")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
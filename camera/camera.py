@@ -1,31 +1,50 @@
-import sys
+import argparse
+import os
 
 import cv2
 
+from camera.frame_source import (
+    FRAME_SOURCE_ENV,
+    CameraSource,
+    capture_candidates,
+    gstreamer_camera_pipeline,
+    open_frame_source,
+    select_capture_source,
+    synthetic_capture_candidates,
+)
+
 window_title = "USB Camera"
 
 # ASSIGN CAMERA ADRESS to DEVICE HERE!
-pipeline = " ! ".join(["v4l2src device=/dev/video0",
-                       "video/x-raw, width=640, height=480, framerate=30/1",
-                       "videoconvert",
-                       "video/x-raw, format=(string)BGR",
-                       "appsink"
-                       ])
+device = "/dev/video0"
 
-# Sample pipeline for H.264 video, tested on Logitech C920
-h264_pipeline = " ! ".join(["v4l2src device=/dev/video0",
-                            "video/x-h264, width=1280, height=720, framerate=30/1, format=H264",
-                            "avdec_h264",
-                            "videoconvert",
-                            "video/x-raw, format=(string)BGR",
-                            "appsink sync=false"
-                            ])
+# Raw 640x480 pipeline. Its appsink keeps only the newest frame (drop=true
+# max-buffers=1), so a slow reader never gets a backlog
+pipeline = gstreamer_camera_pipeline(device, 640, 480, 30)
 
-def show_camera():
+# Sample pipeline for H.264 video, tested on Logitech C920
+h264_pipeline = gstreamer_camera_pipeline(device, 1280, 720, 30, h264=True)
 
+def open_capture(test_video=None, test=False):
     # Full list of Video Capture APIs (video backends): https://docs.opencv.org/3.4/d4/d15/group__videoio__flags__base.html
-    # For webcams, we use V4L2
-    video_capture = cv2.VideoCapture('/dev/video0', cv2.CAP_V4L2)
+    # $FRAME_SOURCE can select a video file, image directory or synthetic feed instead
+    if os.environ.get(FRAME_SOURCE_ENV):
+        return open_frame_source()
+
+    # Capture configurations to try (both pipelines above, then V4L2 with
+    # MJPEG, YUYV and driver defaults); the lowest-latency working one is used.
+    # --test probes videotestsrc / filesrc pipelines instead of a physical camera
+    video_capture, name, _ = select_capture_source(
+        synthetic_capture_candidates(test_video) if test else capture_candidates(device)
+    )
+    if video_capture is None:
+        return CameraSource(device, cv2.CAP_V4L2, fallback=None)
+    print(f"Using {name}: {video_capture}")
+    return video_capture
+
+def show_camera(test_video=None, test=False):
+
+    video_capture = open_capture(test_video, test)
 
     if video_capture.isOpened():
         try:
@@ -54,4 +73,8 @@ def show_camera():
 
 
 if __name__ == "__main__":
-    show_camera()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Show the camera using the lowest-latency capture backend.")
+    parser.add_argument("--test", action="store_true", help="probe videotestsrc/filesrc pipelines instead of the camera")
+    parser.add_argument("--video", help="video file for the filesrc and file test candidates")
+    args = parser.parse_args()
+    show_camera(args.video, args.test or bool(args.video))
\ No newline at end of file
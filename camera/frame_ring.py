@@ -0,0 +1,178 @@
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Header: magic, slots, height, width, channels, dtype char, latest sequence, reserved
+RING_MAGIC = 0x46524D52494E4731  # "FRMRING1"
+HEADER_FIELDS = 8
+LATEST_FIELD = 6
+
+# Frame data starts on a cache-line boundary
+ALIGNMENT = 64
+
+# Default slot count: enough for a reader to finish a frame before it is reused
+RING_SLOTS = 8
+
+# Poll interval for wait_for_next, in seconds
+POLL_INTERVAL = 0.001
+
+
+def _align(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Held while resource_tracker.register is swapped out by _attach_shared_memory
+_tracker_lock = threading.Lock()
+
+
+def _attach_shared_memory(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching also registers the block with the resource
+    # tracker, which would unlink it when a reader exits. Child processes may
+    # share the producer's tracker, so skip registering rather than unregister.
+    # The swap is process-wide, so creates and other attaches wait for it
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class FrameRing:
+    """
+    Fixed-size frame slots in shared memory, written by one producer and read
+    by any number of threads or processes without copying.
+
+    Each slot carries the sequence number and timestamp of the frame in it.
+    The producer marks a slot as being written (sequence -1) before filling
+    it and publishes the new sequence afterwards, so it never waits for
+    readers. A reader gets a view straight into the slot; the view stays valid
+    until the producer comes round to that slot again, which still_valid()
+    checks. Readers that keep frames longer should copy.
+
+    The producer creates the ring with FrameRing.create() and other processes
+    attach by name with FrameRing.attach(). Threads in the producer's process
+    can share the producer's object.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != RING_MAGIC:
+            raise ValueError(f"Shared memory {shm.name!r} is not a frame ring")
+        self.header = header
+        self.slots = int(header[1])
+        self.shape = tuple(int(size) for size in header[2:5])
+        self.dtype = np.dtype(chr(int(header[5])))
+
+        offset = HEADER_FIELDS * 8
+        self.sequences = np.ndarray((self.slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.slots * 8
+        self.timestamps = np.ndarray((self.slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset = _align(offset + self.slots * 8)
+
+        frame_bytes = _align(int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.frames = [
+            np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf, offset=offset + slot * frame_bytes)
+            for slot in range(self.slots)
+        ]
+
+    @classmethod
+    def create(cls, shape, dtype=np.uint8, slots=RING_SLOTS, name=None):
+        """Create a ring for frames of one shape and dtype, e.g. (480, 640, 3) uint8."""
+        shape = tuple(shape) + (1,) * (3 - len(shape))
+        dtype = np.dtype(dtype)
+        frame_bytes = _align(int(np.prod(shape)) * dtype.itemsize)
+        size = _align(HEADER_FIELDS * 8 + slots * 16) + slots * frame_bytes
+
+        with _tracker_lock:
+            # Registered with the resource tracker, so not while an attach has it swapped out
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (RING_MAGIC, slots, *shape, ord(dtype.char), 0, 0)
+        ring = cls(shm, owner=True)
+        ring.sequences[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a ring created by another process."""
+        return cls(_attach_shared_memory(name), owner=False)
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot and publish it. Returns its sequence number."""
+        sequence = int(self.header[LATEST_FIELD]) + 1
+        slot = sequence % self.slots
+
+        self.sequences[slot] = -1  # being written
+        self.frames[slot][...] = frame.reshape(self.shape)
+        self.timestamps[slot] = time.monotonic() if timestamp is None else timestamp
+        self.sequences[slot] = sequence
+        self.header[LATEST_FIELD] = sequence
+        return sequence
+
+    @property
+    def latest_sequence(self):
+        return int(self.header[LATEST_FIELD])
+
+    def get(self, sequence, copy=False):
+        """
+        (frame, timestamp) for a sequence number, or None if it isn't in the
+        ring (not written yet, or already overwritten).
+        """
+        if sequence <= 0:
+            return None
+        slot = sequence % self.slots
+        if self.sequences[slot] != sequence:
+            return None
+        frame = self.frames[slot]
+        timestamp = float(self.timestamps[slot])
+        if copy:
+            frame = frame.copy()
+            # The producer may have come round while we copied
+            if self.sequences[slot] != sequence:
+                return None
+        return frame, timestamp
+
+    def latest(self, copy=False):
+        """(sequence, frame, timestamp) of the newest frame, or None if there is none."""
+        while True:
+            sequence = self.latest_sequence
+            if sequence == 0:
+                return None
+            item = self.get(sequence, copy)
+            if item is not None:
+                return (sequence, *item)
+
+    def still_valid(self, sequence):
+        """Whether a frame obtained without copying has not been overwritten since."""
+        return self.sequences[sequence % self.slots] == sequence
+
+    def wait_for_next(self, after_sequence, timeout=None):
+        """Wait for a frame newer than after_sequence and return latest(), or None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.latest_sequence <= after_sequence:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+        return self.latest()
+
+    def close(self):
+        # Views into the buffer must go before the mapping can be closed
+        self.frames = []
+        self.sequences = self.timestamps = self.header = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __repr__(self):
+        return f"FrameRing({self.name!r}, slots={self.slots}, shape={self.shape}, dtype={self.dtype})"
@@ -0,0 +1,462 @@
+import abc
+import glob
+import os
+import time
+from urllib.parse import parse_qsl
+
+import cv2
+import numpy as np
+
+# Environment variables selecting the frame source, e.g.
+#   FRAME_SOURCE=videos/Project_Demo_Login.mp4 FRAME_SOURCE_REALTIME=0 python main.py
+FRAME_SOURCE_ENV = "FRAME_SOURCE"
+FRAME_SOURCE_REALTIME_ENV = "FRAME_SOURCE_REALTIME"
+
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+
+# GStreamer sink that keeps only the newest frame, so reads never return a backlog
+LATEST_FRAME_APPSINK = "appsink drop=true max-buffers=1 sync=false"
+
+# Frames read when probing a capture configuration
+PROBE_FRAMES = 30
+
+
+class FrameSource(abc.ABC):
+    """
+    Base class for frame sources. Sources follow the cv2.VideoCapture
+    interface (isOpened/read/release/get), so they can be handed to code
+    that expects a capture.
+
+    Subclasses implement _read_frame(). With realtime=True, read() is paced
+    to the source's fps; otherwise frames are returned as fast as they can be
+    produced.
+    """
+
+    def __init__(self, fps=30.0, realtime=True):
+        self.fps = fps
+        self.realtime = realtime
+        self.frames_read = 0
+        self._next_frame_time = None
+
+    def _pace(self):
+        if not self.realtime or not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_frame_time is not None and now < self._next_frame_time:
+            time.sleep(self._next_frame_time - now)
+            now = self._next_frame_time
+        self._next_frame_time = now + 1.0 / self.fps
+
+    def read(self):
+        self._pace()
+        ret, frame = self._read_frame()
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    @abc.abstractmethod
+    def _read_frame(self):
+        """Return (ret, frame) for the next frame, like cv2.VideoCapture.read()."""
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frames_read)
+        return 0.0
+
+    def __repr__(self):
+        return f"{type(self).__name__}(fps={self.fps}, realtime={self.realtime})"
+
+
+class CameraSource(FrameSource):
+    """
+    A live camera. The device paces itself, so there is no extra pacing.
+
+    fourcc (e.g. "MJPG"), width, height, fps and buffersize are requested from
+    the driver when given; what it actually agreed to is in self.negotiated.
+    """
+
+    def __init__(self, device=0, api=cv2.CAP_ANY, fallback="/dev/video0",
+                 fourcc=None, width=None, height=None, fps=None, buffersize=None):
+        super().__init__(fps=None, realtime=False)
+        self.device = device
+        self.api = api
+        self.buffersize = buffersize
+        self.capture = cv2.VideoCapture(device, api)
+        if not self.capture.isOpened() and fallback is not None:
+            # Try specific device path as fallback
+            self.capture = cv2.VideoCapture(fallback, api)
+            self.device = fallback
+
+        # FOURCC first: the resolutions and rates on offer depend on the format
+        if fourcc:
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        for prop, value in ((cv2.CAP_PROP_FRAME_WIDTH, width), (cv2.CAP_PROP_FRAME_HEIGHT, height),
+                            (cv2.CAP_PROP_FPS, fps), (cv2.CAP_PROP_BUFFERSIZE, buffersize)):
+            if value:
+                self.capture.set(prop, value)
+
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else None
+        fourcc_code = int(self.capture.get(cv2.CAP_PROP_FOURCC))
+        self.negotiated = {
+            "fourcc": "".join(chr((fourcc_code >> 8 * i) & 0xFF) for i in range(4)) if fourcc_code > 0 else None,
+            "width": int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.fps,
+        }
+
+    def _read_frame(self):
+        return self.capture.read()
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+
+class GStreamerSource(FrameSource):
+    """
+    A GStreamer pipeline ending in an appsink, e.g. from gstreamer_camera_pipeline.
+    Needs OpenCV built with GStreamer; otherwise isOpened() is False.
+    """
+
+    def __init__(self, pipeline):
+        super().__init__(fps=None, realtime=False)
+        self.pipeline = pipeline
+        self.capture = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else None
+
+    def _read_frame(self):
+        return self.capture.read()
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def __repr__(self):
+        return f"GStreamerSource({self.pipeline!r})"
+
+
+def gstreamer_camera_pipeline(device="/dev/video0", width=640, height=480, fps=30, h264=False):
+    """v4l2src pipeline delivering BGR frames; h264=True decodes the camera's H.264 stream (e.g. Logitech C920)."""
+    if h264:
+        caps = [f"video/x-h264, width={width}, height={height}, framerate={fps}/1, format=H264", "avdec_h264"]
+    else:
+        caps = [f"video/x-raw, width={width}, height={height}, framerate={fps}/1"]
+    return " ! ".join([f"v4l2src device={device}", *caps, "videoconvert",
+                       "video/x-raw, format=(string)BGR", LATEST_FRAME_APPSINK])
+
+
+def gstreamer_test_pipeline(width=640, height=480, fps=30, pattern="ball"):
+    """Live videotestsrc pipeline, for trying the GStreamer path without a camera."""
+    return " ! ".join([f"videotestsrc is-live=true pattern={pattern}",
+                       f"video/x-raw, width={width}, height={height}, framerate={fps}/1",
+                       "videoconvert", "video/x-raw, format=(string)BGR", LATEST_FRAME_APPSINK])
+
+
+def gstreamer_file_pipeline(path):
+    """filesrc pipeline decoding a video file at its own rate, for testing without a camera."""
+    return " ! ".join([f"filesrc location={path}", "decodebin", "videoconvert",
+                       "video/x-raw, format=(string)BGR",
+                       "appsink drop=true max-buffers=1 sync=true"])
+
+
+class VideoFileSource(FrameSource):
+    """Replays a video file at its recorded frame rate, looping by default."""
+
+    def __init__(self, path, realtime=True, loop=True):
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+        super().__init__(fps=self.capture.get(cv2.CAP_PROP_FPS) or 30.0, realtime=realtime)
+
+    def _read_frame(self):
+        ret, frame = self.capture.read()
+        if not ret and self.loop and self.frames_read > 0:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return ret, frame
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return self.capture.get(prop)
+
+
+class ImageDirectorySource(FrameSource):
+    """Plays the images in a directory in name order at a fixed frame rate."""
+
+    def __init__(self, directory, fps=30.0, realtime=True, loop=True):
+        super().__init__(fps=fps, realtime=realtime)
+        self.directory = directory
+        self.loop = loop
+        self.paths = sorted(
+            path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(directory, pattern))
+        )
+        self.index = 0
+
+    def _read_frame(self):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+    def isOpened(self):
+        return bool(self.paths)
+
+
+class SyntheticSource(FrameSource):
+    """Generated test pattern: a gradient with a moving circle and a frame counter."""
+
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        x = np.linspace(0, 255, width, dtype=np.uint8)
+        y = np.linspace(0, 255, height, dtype=np.uint8)
+        self.background = np.dstack([
+            np.tile(x, (height, 1)),
+            np.tile(y[:, None], (1, width)),
+            np.full((height, width), 96, dtype=np.uint8),
+        ])
+
+    def _read_frame(self):
+        frame = self.background.copy()
+        t = self.frames_read / (self.fps or 30.0)
+        center = (
+            int(self.width / 2 + self.width / 3 * np.cos(t)),
+            int(self.height / 2 + self.height / 3 * np.sin(t)),
+        )
+        cv2.circle(frame, center, min(self.width, self.height) // 10, (255, 255, 255), -1)
+        cv2.putText(frame, f"frame {self.frames_read}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2, cv2.LINE_AA)
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        return super().get(prop)
+
+
+def capture_candidates(device="/dev/video0", width=640, height=480, fps=30):
+    """
+    (name, factory) pairs for opening a camera, lowest expected latency first:
+    GStreamer with a latest-frame appsink, then V4L2 with MJPEG, raw YUYV and
+    the driver defaults, each with a single-frame driver queue where supported.
+    """
+    return [
+        ("gstreamer", lambda: GStreamerSource(gstreamer_camera_pipeline(device, width, height, fps))),
+        ("gstreamer-h264", lambda: GStreamerSource(gstreamer_camera_pipeline(device, 1280, 720, fps, h264=True))),
+        ("v4l2-mjpg", lambda: CameraSource(device, cv2.CAP_V4L2, None, "MJPG", width, height, fps, buffersize=1)),
+        ("v4l2-yuyv", lambda: CameraSource(device, cv2.CAP_V4L2, None, "YUYV", width, height, fps, buffersize=1)),
+        ("v4l2", lambda: CameraSource(device, cv2.CAP_V4L2, None, buffersize=1)),
+    ]
+
+
+def synthetic_capture_candidates(video_path=None, width=640, height=480, fps=30):
+    """Candidates that need no camera: GStreamer videotestsrc/filesrc and plain file decoding."""
+    candidates = [("gstreamer-test", lambda: GStreamerSource(gstreamer_test_pipeline(width, height, fps)))]
+    if video_path:
+        candidates.append(("gstreamer-file", lambda: GStreamerSource(gstreamer_file_pipeline(video_path))))
+        candidates.append(("file", lambda: VideoFileSource(video_path, loop=True)))
+    candidates.append(("synthetic", lambda: SyntheticSource(width, height, fps)))
+    return candidates
+
+
+def probe_capture(source, frames=PROBE_FRAMES):
+    """
+    Measure an opened source: delivered fps and frame age.
+
+    Frame age is estimated by stalling for a few frame intervals, then
+    counting how many reads return at once before one has to wait for the
+    device. Those frames were queued while we stalled, so a source that keeps
+    a backlog hands out frames about queued * interval old; a latest-frame
+    source has at most one waiting.
+    """
+    ret, frame = source.read()
+    if not ret:
+        return None
+
+    start = time.perf_counter()
+    delivered = 0
+    for _ in range(frames):
+        ret, frame = source.read()
+        delivered += ret
+    elapsed = time.perf_counter() - start
+    fps = delivered / elapsed if elapsed > 0 else 0.0
+    if not delivered or not fps:
+        return None
+
+    interval = 1.0 / fps
+    time.sleep(interval * 4)
+    queued = 0
+    for _ in range(8):
+        read_start = time.perf_counter()
+        source.read()
+        if time.perf_counter() - read_start > interval / 2:
+            break
+        queued += 1
+
+    return {
+        "fps": fps,
+        "frame_age_ms": max(queued, 1) * interval * 1000,
+        "queued_frames": queued,
+        "width": frame.shape[1],
+        "height": frame.shape[0],
+    }
+
+
+def select_capture_source(candidates=None, min_fps=10.0, frames=PROBE_FRAMES, verbose=True):
+    """
+    Open and probe each (name, factory) candidate and keep the working one
+    with the lowest frame age, preferring higher fps on ties. Returns
+    (source, name, reports); source is None if nothing worked.
+    """
+    if candidates is None:
+        candidates = capture_candidates()
+
+    reports = []
+    best = None
+    for name, factory in candidates:
+        try:
+            source = factory()
+        except Exception as e:
+            reports.append({"name": name, "error": str(e)})
+            continue
+        if not source.isOpened():
+            source.release()
+            reports.append({"name": name, "error": "could not open"})
+            continue
+
+        report = probe_capture(source, frames)
+        if report is None or report["fps"] < min_fps:
+            source.release()
+            reports.append({"name": name, "error": "no frames" if report is None else "too slow", **(report or {})})
+            continue
+
+        report["name"] = name
+        reports.append(report)
+        if verbose:
+            print(f"{name}: {report['fps']:.1f} fps, ~{report['frame_age_ms']:.0f} ms old, "
+                  f"{report['width']}x{report['height']}")
+
+        key = (report["frame_age_ms"], -report["fps"])
+        if best is None or key < best[0]:
+            if best is not None:
+                best[1].release()
+            best = (key, source, name)
+        else:
+            source.release()
+
+    if best is None:
+        return None, None, reports
+    return best[1], best[2], reports
+
+
+def reopen_frame_source(source):
+    """
+    Open a new source like an already opened one without probing again: a
+    GStreamer source reuses its pipeline and a camera asks for the settings it
+    negotiated last time. Returns None for sources that are cheap to open
+    from their spec.
+    """
+    if isinstance(source, GStreamerSource):
+        return GStreamerSource(source.pipeline)
+    if isinstance(source, CameraSource):
+        negotiated = source.negotiated
+        return CameraSource(source.device, source.api, fallback=None, fourcc=negotiated["fourcc"],
+                            width=negotiated["width"], height=negotiated["height"], fps=negotiated["fps"],
+                            buffersize=source.buffersize)
+    return None
+
+
+def parse_realtime(value, default=True):
+    if value is None or value == "":
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "fast")
+
+
+def open_frame_source(spec=None, realtime=None, default="camera"):
+    """
+    Open a frame source from a spec string. Without a spec, $FRAME_SOURCE is
+    used, then default. Specs:
+      camera, camera:<index or device path>
+      v4l2:<device path>[?fourcc=MJPG&width=1280&height=720&fps=30&buffersize=1]
+      gst:<pipeline ending in appsink>, auto, auto:<device path> (probe and pick the fastest)
+      video:<file>, images:<directory>, synthetic, synthetic:<width>x<height>
+      or a bare camera index, video file or image directory.
+    realtime defaults to $FRAME_SOURCE_REALTIME (on unless set to 0/false/fast).
+    """
+    spec = spec or os.environ.get(FRAME_SOURCE_ENV) or default
+    if realtime is None:
+        realtime = parse_realtime(os.environ.get(FRAME_SOURCE_REALTIME_ENV))
+
+    kind, _, arg = spec.partition(":")
+    if kind == "gst":
+        return GStreamerSource(arg)
+    if kind == "auto":
+        source, name, _ = select_capture_source(capture_candidates(arg or "/dev/video0"))
+        if source is None:
+            print("No capture backend worked, falling back to the default camera")
+            return CameraSource()
+        print(f"Selected capture backend {name}")
+        return source
+    if kind not in ("camera", "v4l2", "video", "images", "synthetic"):
+        # Bare camera index, file or directory
+        if spec.isdigit():
+            kind, arg = "camera", spec
+        elif os.path.isdir(spec):
+            kind, arg = "images", spec
+        else:
+            kind, arg = "video", spec
+
+    if kind == "camera":
+        device = int(arg) if arg.isdigit() else (arg or 0)
+        return CameraSource(device)
+    if kind == "v4l2":
+        device, _, query = arg.partition("?")
+        options = dict(parse_qsl(query))
+        numbers = {key: int(value) for key, value in options.items() if key != "fourcc"}
+        return CameraSource(device or "/dev/video0", cv2.CAP_V4L2, fallback=None,
+                            fourcc=options.get("fourcc"), **numbers)
+    if kind == "video":
+        return VideoFileSource(arg, realtime=realtime)
+    if kind == "images":
+        return ImageDirectorySource(arg, realtime=realtime)
+
+    width, height = 640, 480
+    if arg:
+        width, height = (int(value) for value in arg.lower().split("x"))
+    return SyntheticSource(width, height, realtime=realtime)
@@ -0,0 +1,79 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# Job states
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# How long quitting waits for running jobs, in ms
+SHUTDOWN_WAIT_MS = 5000
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function once the job has been cancelled."""
+
+
+class JobSignals(QObject):
+    # QRunnable isn't a QObject, so the job's signals live here. Slots on
+    # widgets run on the GUI thread. Each signal carries the job first.
+    progress = Signal(object, str)
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+
+
+class AuthJob(QRunnable):
+    """
+    Runs work(job, *args) on the shared thread pool, off the GUI thread.
+
+    The work function reports progress with job.progress(message) and should
+    call job.check_cancelled() before anything it shouldn't do once the user
+    has moved on. Its return value arrives through signals.finished, an
+    exception through signals.failed. A cancelled job emits nothing more.
+    """
+
+    def __init__(self, work, *args):
+        super().__init__()
+        # The page keeps the job; don't let Qt delete it after run()
+        self.setAutoDelete(False)
+        self.work = work
+        self.args = args
+        self.signals = JobSignals()
+        self.state = JOB_RUNNING
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, message):
+        self.check_cancelled()
+        self.signals.progress.emit(self, message)
+
+    def run(self):
+        try:
+            result = self.work(self, *self.args)
+            self.check_cancelled()
+        except JobCancelled:
+            self.state = JOB_CANCELLED
+            return
+        except Exception as e:
+            self.state = JOB_FAILED
+            print(f"Background job failed: {e}")
+            self.signals.failed.emit(self, str(e))
+            return
+        self.state = JOB_DONE
+        self.signals.finished.emit(self, result)
+
+
+def start_job(job):
+    QThreadPool.globalInstance().start(job)
+    return job
+
+
+def wait_for_jobs(timeout_ms=SHUTDOWN_WAIT_MS):
+    """Wait for background jobs to finish, e.g. before the application quits."""
+    return QThreadPool.globalInstance().waitForDone(timeout_ms)
@@ -1,8 +1,11 @@
-import cv2
 from PySide6.QtCore import QTimer, Qt
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QLabel, QPushButton, QScrollArea
-from PySide6.QtGui import QImage, QPixmap
-from .camera_manager import get_camera
+from hands.burst_auth import BURST_SIZE
+from .auth_jobs import JOB_RUNNING, AuthJob, start_job
+from .camera_manager import CAMERA_FAILED, CAMERA_OPENING
+from .frame_dispatcher import get_frame_dispatcher
+from .preview_renderer import VideoPreview
+
 
 class AuthPage(QWidget):
     def __init__(self, main_window, page_title="Auth"):
@@ -11,7 +14,9 @@ class AuthPage(QWidget):
         self.setWindowTitle(page_title)
         self.setFixedSize(700, 450)
         self.page_title = page_title
-        self.frame = None
+        self.frame = None  # Full-resolution frame, only kept once captured
+        self.burst_frames = []  # Frames grabbed by the last "Capture Image"
+        self.submit_job = None  # Submission running in the background
 
         self.capturing = True  # Flag to track if video is running
 
@@ -31,16 +36,8 @@ class AuthPage(QWidget):
         layout.addWidget(scroll_area)
         self.setLayout(layout)
 
-        # Use the shared camera instance instead of creating a new one
-        self.capture = get_camera()
-        if not self.capture.isOpened():
-            self.video_label.setText("Unable to access camera.")
-            print("Camera failed to open in", page_title)
-        else:
-            print("Camera successfully opened in", page_title)
-            self.timer = QTimer(self)
-            self.timer.timeout.connect(self.update_frame)
-            self.timer.start(30)
+        # Frames come from the shared frame dispatcher, which only feeds the
+        # page on screen and keeps the camera open while one is shown
 
     def setup_ui(self):
         content_layout = QVBoxLayout()
@@ -66,7 +63,7 @@ class AuthPage(QWidget):
         self.username_edit.setPlaceholderText("Enter your username")
         content_layout.addWidget(self.username_edit)
 
-        self.video_label = QLabel("Camera feed will appear here")
+        self.video_label = VideoPreview("Camera feed will appear here")
         self.video_label.setFixedSize(480, 320)
         self.video_label.setStyleSheet("background-color: black;")
         self.video_label.setAlignment(Qt.AlignCenter)
@@ -90,34 +87,39 @@ class AuthPage(QWidget):
   
     def capture_frame(self, frame):
         self.frame = frame
-        local_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = local_frame.shape
-        bytes_per_line = ch * w
-        q_image = QImage(local_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(q_image)
-        self.video_label.setPixmap(pixmap.scaled(
-                self.video_label.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            ))
-
-    def update_frame(self):
-        if not self.capturing:
-            return
+        self.video_label.show_frame(frame)
 
-        ret, frame = self.capture.read()
-        if ret:
-            self.capture_frame(frame)
+    def showEvent(self, event):
+        super().showEvent(event)
+        get_frame_dispatcher().show_page(self)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        get_frame_dispatcher().hide_page(self)
+
+    def show_camera_state(self, state):
+        if state == CAMERA_OPENING:
+            self.video_label.setText("Starting camera...")
+        elif state == CAMERA_FAILED:
+            self.video_label.setText("Unable to access camera.")
+            print("Camera failed to open in", self.page_title)
         else:
-            print(f"Failed to capture frame in {self.page_title}")
+            print("Camera successfully opened in", self.page_title)
+
+    def show_preview(self, frame):
+        # Preview only: the frame is scaled into the label's buffer, not kept
+        self.video_label.show_frame(frame)
 
     def capture_image(self):
         self.hide_error()
-        ret, frame = self.capture.read()
-        if ret:
+        # Take the newest few frames the grabber already has, so one bad frame
+        # doesn't force a retake and the button returns immediately
+        frames = get_frame_dispatcher().recent(BURST_SIZE)
+        if frames:
             self.capturing = False  # Stop updating the video
-            self.capture_frame(frame)
-            print(f"Image captured: frame shape = {self.frame.shape if self.frame is not None else 'None'}")
+            self.burst_frames = frames
+            self.capture_frame(frames[-1])
+            print(f"Image captured: {len(frames)} frames, frame shape = {self.frame.shape}")
 
             # Disable capture button, enable restart button
             self.capture_button.setEnabled(False)
@@ -126,9 +128,18 @@ class AuthPage(QWidget):
             print(f"Failed to capture image in {self.page_title}")
             self.show_error("ERROR: Failed to capture image. Check your camera.")
             
+    def captured_frames(self):
+        """Frames to evaluate on submit: the captured burst, or the captured frame."""
+        if self.burst_frames:
+            return self.burst_frames
+        return [self.frame] if self.frame is not None else []
+
     def reset_capture(self):
         """Reset the camera capture to allow taking a new image"""
+        self.cancel_submit()
         self.capturing = True
+        self.frame = None
+        self.burst_frames = []
         self.capture_button.setEnabled(True)
         self.restart_button.setEnabled(False)
         self.submit_button.setEnabled(True)
@@ -154,9 +165,64 @@ class AuthPage(QWidget):
         # TODO: Implement this in the sub class
         pass
 
+    def start_submit(self, work, *args):
+        """
+        Run work(job, *args) in the background; its result is passed to
+        submit_finished() on the GUI thread. Ignored while a submission is
+        already running.
+        """
+        if self.submit_job is not None and self.submit_job.state == JOB_RUNNING:
+            print(f"Ignoring duplicate submit in {self.page_title}")
+            return None
+
+        job = AuthJob(work, *args)
+        job.signals.progress.connect(self.on_submit_progress)
+        job.signals.finished.connect(self.on_submit_finished)
+        job.signals.failed.connect(self.on_submit_failed)
+        self.submit_job = job
+        self.submit_button.setEnabled(False)
+        self.submit_button.setText("Submitting...")
+        return start_job(job)
+
+    def cancel_submit(self):
+        """Drop the running submission, e.g. when the user retakes the image."""
+        if self.submit_job is not None:
+            if self.submit_job.state == JOB_RUNNING:
+                print(f"Cancelled submission in {self.page_title}")
+            self.submit_job.cancel()
+            self.submit_job = None
+        self.submit_button.setText("Submit")
+
+    def current_submit(self, job):
+        # Signals from a cancelled or superseded job arrive late; ignore them
+        return job is self.submit_job and not job.cancelled
+
+    def on_submit_progress(self, job, message):
+        if self.current_submit(job):
+            self.submit_button.setText(message)
+
+    def on_submit_finished(self, job, result):
+        if not self.current_submit(job):
+            return
+        self.submit_job = None
+        self.submit_button.setText("Submit")
+        self.submit_finished(result)
+
+    def on_submit_failed(self, job, message):
+        if not self.current_submit(job):
+            return
+        self.submit_job = None
+        self.submit_button.setText("Submit")
+        self.submit_button.setEnabled(True)
+        self.show_error(f"ERROR: {message}")
+
+    def submit_finished(self, result):
+        # Implemented in the sub class
+        pass
+
     def closeEvent(self, event):
         """ Cleanup when the window is closed. """
-        if hasattr(self, 'timer'):
-            self.timer.stop()
-        # Don't release the camera here anymore - it's managed by camera_manager
+        # The camera itself is closed by camera_manager once no page is shown
+        get_frame_dispatcher().hide_page(self)
+        self.cancel_submit()
         event.accept()
\ No newline at end of file
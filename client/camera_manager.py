@@ -1,28 +1,387 @@
-import cv2
+import threading
+import time
+from collections import deque
+
+from camera.frame_ring import RING_SLOTS, FrameRing
+from camera.frame_source import open_frame_source, reopen_frame_source
 
 # Singleton camera instance
 _camera_instance = None
 
+# Frame source used when opening the camera; None means $FRAME_SOURCE or the default camera
+_frame_source_spec = None
+_frame_source_realtime = None
+
+# Last source that opened, so reopening after an idle release skips probing
+# and format negotiation
+_last_opened_source = None
+
+# Slots of the shared-memory frame ring the grabber also publishes to; 0 means no ring
+_frame_ring_slots = 0
+
+# Singleton grabber reading the camera in the background
+_grabber_instance = None
+_grabber_lock = threading.Lock()
+
+# Recent frames kept by the grabber, enough for a capture burst
+GRABBER_HISTORY = 8
+
+# Pause after a failed read before trying again
+READ_RETRY_DELAY = 0.01
+
+# Camera states seen by leases
+CAMERA_CLOSED = "closed"
+CAMERA_OPENING = "opening"
+CAMERA_OPEN = "open"
+CAMERA_FAILED = "failed"
+
+# Seconds the camera stays open after the last lease is released
+CAMERA_IDLE_TIMEOUT = 30.0
+
+# Camera leases: how many are held, the state of the shared camera, the
+# thread opening it and the timer that closes it once idle
+_lease_lock = threading.Lock()
+_lease_count = 0
+_camera_state = CAMERA_CLOSED
+_camera_opener = None
+_idle_timer = None
+_idle_timeout = CAMERA_IDLE_TIMEOUT
+
+
+class FrameGrabber:
+    """
+    Owns the camera and reads it continuously on a background thread, so the
+    GUI never blocks in read() and pages don't compete for the device.
+
+    Each read() returns a new array, which is published as the front frame
+    with a sequence number and monotonic timestamp. Buffers are not reused:
+    the history and capture bursts hand frames to other threads, so a
+    published frame is never written to again and consumers may keep it.
+
+    With ring_slots, frames are also written to a FrameRing created on the
+    first frame, so worker processes can read them by the ring's name.
+
+    stop() may give up waiting while the thread is blocked in read(); the
+    thread then closes the ring and releases the capture itself once read()
+    returns, so neither is freed under it.
+    """
+
+    def __init__(self, capture, history=GRABBER_HISTORY, ring_slots=0):
+        self.capture = capture
+        self.ring_slots = ring_slots
+        self.ring = None
+        self.ring_skipped = 0
+        self._condition = threading.Condition()
+        self._front = (None, 0, None)  # (frame, sequence, timestamp)
+        self._recent = deque(maxlen=history)
+        self._running = True
+        self._exited = False
+        self._release_on_exit = None  # set by stop() if the thread was still reading
+        self.failed_reads = 0
+
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        sequence = 0
+        while self._running and self.capture.isOpened():
+            ret, back = self.capture.read()
+            timestamp = time.monotonic()
+            if not ret:
+                self.failed_reads += 1
+                time.sleep(READ_RETRY_DELAY)
+                continue
+
+            sequence += 1
+            if self.ring_slots:
+                self._write_ring(back, timestamp)
+            with self._condition:
+                self._front = (back, sequence, timestamp)
+                self._recent.append(self._front)
+                self._condition.notify_all()
+
+        with self._condition:
+            self._running = False
+            self._exited = True
+            release = self._release_on_exit
+            self._condition.notify_all()
+        if release is not None:
+            self._shut_down(release)
+
+    def _shut_down(self, release):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if release:
+            self.capture.release()
+
+    def _write_ring(self, frame, timestamp):
+        if self.ring is None:
+            self.ring = FrameRing.create(frame.shape, frame.dtype, self.ring_slots)
+        if frame.size != self.ring.frames[0].size or frame.dtype != self.ring.dtype:
+            # Readers are attached to the existing layout, so keep it
+            self.ring_skipped += 1
+            return
+        self.ring.write(frame, timestamp)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def latest(self):
+        """The newest (frame, sequence, timestamp) without blocking; frame is None before the first one."""
+        with self._condition:
+            return self._front
+
+    def wait_for_next(self, after_sequence=None, timeout=None):
+        """
+        Wait for a frame newer than after_sequence (default: the current one)
+        and return its (frame, sequence, timestamp), or the latest one on timeout.
+        """
+        with self._condition:
+            if after_sequence is None:
+                after_sequence = self._front[1]
+            self._condition.wait_for(lambda: self._front[1] > after_sequence or not self._running, timeout)
+            return self._front
+
+    def recent(self, count):
+        """The newest count frames, oldest first, without waiting."""
+        with self._condition:
+            return [frame for frame, _, _ in list(self._recent)[-count:]]
+
+    def stop(self, release=False):
+        """
+        Stop the thread and close the ring, and with release also release the
+        capture. Returns False if the thread was still in read() and will do
+        this itself when read() returns.
+        """
+        self._running = False
+        self._thread.join(timeout=1.0)
+        with self._condition:
+            if not self._exited:
+                self._release_on_exit = release
+                return False
+        self._shut_down(release)
+        return True
+
+
+class CameraLease:
+    """
+    A hold on the shared camera, from acquire_camera(). The camera opens in
+    the background when the first lease is taken, so check state() or wait
+    for it; until then latest() has no frame. Release the lease when the
+    frames aren't needed any more.
+    """
+
+    def __init__(self):
+        self.active = True
+
+    def state(self):
+        return _camera_state if self.active else CAMERA_CLOSED
+
+    def _grabber(self):
+        grabber = _grabber_instance
+        if not self.active or _camera_state != CAMERA_OPEN or grabber is None:
+            return None
+        return grabber
+
+    def isOpened(self):
+        grabber = self._grabber()
+        return grabber is not None and grabber.isOpened()
+
+    def wait_until_open(self, timeout=None):
+        """Wait for the camera to finish opening; returns whether it is open."""
+        opener = _camera_opener
+        if opener is not None:
+            opener.join(timeout)
+        return self.isOpened()
+
+    def latest(self):
+        """The grabber's newest (frame, sequence, timestamp); frame is None while the camera is not open."""
+        grabber = self._grabber()
+        return grabber.latest() if grabber is not None else (None, 0, None)
+
+    def wait_for_frame(self, timeout=None):
+        """Wait for the camera to open and deliver a frame; returns it, or None on timeout or failure."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.wait_until_open(timeout):
+            return None
+        grabber = self._grabber()
+        if grabber is None:
+            return None
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        frame, _, _ = grabber.wait_for_next(0, remaining)
+        return frame
+
+    def recent(self, count):
+        grabber = self._grabber()
+        return grabber.recent(count) if grabber is not None else []
+
+    def frame_ring(self, timeout=2.0):
+        """
+        The grabber's FrameRing once the first frame is in, or None if the ring
+        is disabled (see enable_frame_ring) or no frame arrived within timeout.
+        Pass ring.name to worker processes so they can FrameRing.attach() it,
+        and keep the lease until they are done with it.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.wait_until_open(timeout):
+            return None
+        grabber = self._grabber()
+        if grabber is None or not grabber.ring_slots:
+            return None
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        grabber.wait_for_next(0, remaining)
+        return grabber.ring
+
+    def release(self):
+        if self.active:
+            self.active = False
+            _release_lease()
+
+
+def set_frame_source(spec, realtime=None):
+    """Select the frame source (see camera.frame_source.open_frame_source) before the camera is opened."""
+    global _frame_source_spec, _frame_source_realtime, _last_opened_source
+    _frame_source_spec = spec
+    _frame_source_realtime = realtime
+    _last_opened_source = None
+
+
+def set_camera_idle_timeout(seconds):
+    """How long the camera stays open once no lease is held."""
+    global _idle_timeout
+    _idle_timeout = seconds
+
+
+def enable_frame_ring(slots=RING_SLOTS):
+    """Have the frame grabber also publish frames to a shared-memory ring (0 turns it off)."""
+    global _frame_ring_slots
+    _frame_ring_slots = slots
+
+
 def get_camera():
     """Get a shared camera instance. Creates the camera if it doesn't exist yet."""
-    global _camera_instance
-    
+    global _camera_instance, _last_opened_source
+
     if _camera_instance is None or not _camera_instance.isOpened():
         try:
-            # Try default device
-            _camera_instance = cv2.VideoCapture(0)
-            if not _camera_instance.isOpened():
-                # Try specific device path as fallback
-                _camera_instance = cv2.VideoCapture('/dev/video0')
+            camera = None
+            if _last_opened_source is not None:
+                # Same pipeline or negotiated camera settings as last time
+                camera = reopen_frame_source(_last_opened_source)
+                if camera is not None and not camera.isOpened():
+                    camera.release()
+                    camera = None
+            if camera is None:
+                # Live camera by default, or a video/image/synthetic source for headless runs
+                camera = open_frame_source(_frame_source_spec, _frame_source_realtime)
+            _camera_instance = camera
+            if camera.isOpened():
+                _last_opened_source = camera
+            print(f"Opened frame source {_camera_instance}")
         except Exception as e:
             print(f"Error initializing camera: {e}")
-    
+
     return _camera_instance
 
-def release_camera():
-    """Release the camera when the application is closing."""
-    global _camera_instance
-    
-    if _camera_instance is not None:
+
+def _open_leased_camera():
+    # Runs on the opener thread, so pages don't wait for driver init
+    global _grabber_instance, _camera_state
+
+    with _grabber_lock:
+        camera = get_camera()
+        opened = camera is not None and camera.isOpened()
+        if opened and (_grabber_instance is None or not _grabber_instance.isOpened()):
+            _grabber_instance = FrameGrabber(camera, ring_slots=_frame_ring_slots)
+    with _lease_lock:
+        _camera_state = CAMERA_OPEN if opened else CAMERA_FAILED
+    if not opened:
+        print("Camera failed to open")
+
+
+def acquire_camera():
+    """
+    Take a CameraLease on the shared camera, opening it in the background if
+    it isn't open. The camera is closed once no lease has been held for the
+    idle timeout (set_camera_idle_timeout).
+    """
+    global _lease_count, _camera_state, _camera_opener, _idle_timer
+
+    with _lease_lock:
+        _lease_count += 1
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
+        if _camera_state in (CAMERA_CLOSED, CAMERA_FAILED):
+            _camera_state = CAMERA_OPENING
+            _camera_opener = threading.Thread(target=_open_leased_camera, name="camera-opener", daemon=True)
+            _camera_opener.start()
+    return CameraLease()
+
+
+def _release_lease():
+    global _lease_count, _idle_timer
+
+    with _lease_lock:
+        _lease_count -= 1
+        if _lease_count == 0:
+            _idle_timer = threading.Timer(_idle_timeout, _close_idle_camera)
+            _idle_timer.daemon = True
+            _idle_timer.start()
+
+
+def _close_idle_camera():
+    global _idle_timer, _camera_state
+
+    opener = _camera_opener
+    if opener is not None:
+        opener.join()
+    with _lease_lock:
+        # A lease taken since, or a newer timer, keeps the camera open
+        if _lease_count > 0 or _idle_timer is not threading.current_thread():
+            return
+        _idle_timer = None
+        _camera_state = CAMERA_CLOSED
+
+    # Stopping the grabber can take a while, so acquire_camera() isn't kept waiting
+    with _grabber_lock:
+        with _lease_lock:
+            # A lease taken meanwhile has an opener waiting to reuse the camera
+            if _camera_state != CAMERA_CLOSED:
+                return
+        _close_camera_locked()
+    print("Camera closed after being idle")
+
+
+def _close_camera_locked():
+    # Caller holds _grabber_lock
+    global _camera_instance, _grabber_instance
+
+    released = False
+    if _grabber_instance is not None:
+        # A grabber still blocked in read() releases the capture once it returns
+        released = _grabber_instance.capture is _camera_instance
+        _grabber_instance.stop(release=released)
+        _grabber_instance = None
+
+    if _camera_instance is not None and not released:
         _camera_instance.release()
-        _camera_instance = None 
\ No newline at end of file
+    _camera_instance = None
+
+
+def release_camera():
+    """Release the camera when the application is closing, whatever leases are held."""
+    global _idle_timer, _camera_state
+
+    # Let a camera that is still opening finish, so it is released below
+    opener = _camera_opener
+    if opener is not None:
+        opener.join()
+    with _lease_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
+        _camera_state = CAMERA_CLOSED
+    with _grabber_lock:
+        _close_camera_locked()
@@ -0,0 +1,120 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer
+
+from .camera_manager import acquire_camera
+
+# Preview refresh rate, independent of the camera's frame rate
+DISPLAY_FPS = 30.0
+
+# Singleton dispatcher shared by the auth pages
+_dispatcher_instance = None
+_display_fps = DISPLAY_FPS
+
+
+class FrameDispatcher(QObject):
+    """
+    Drives the camera preview of every page from one timer on the GUI thread.
+
+    Only the page on screen gets frames. It registers itself from showEvent
+    with show_page() and leaves with hide_page(); while no page is shown the
+    timer stops and the camera lease is released. Each tick hands the page
+    the grabber's newest frame if it hasn't seen it yet, so the preview runs
+    at display_fps whatever rate the camera delivers.
+    """
+
+    def __init__(self, display_fps=DISPLAY_FPS):
+        super().__init__()
+        self.display_fps = display_fps
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+
+        self.page = None  # Page receiving frames
+        self.lease = None
+        self.camera_state = None
+        self.sequence = 0  # Sequence number of the last frame delivered
+
+        # GUI-thread time spent delivering frames while a page was shown
+        self.ticks = 0
+        self.delivered = 0
+        self.busy_seconds = 0.0
+        self.shown_since = None
+        self.shown_seconds = 0.0
+
+    def show_page(self, page):
+        self.page = page
+        self.camera_state = None
+        self.sequence = 0
+        if self.lease is None:
+            self.lease = acquire_camera()
+            self.shown_since = time.perf_counter()
+        self.timer.start(max(1, round(1000 / self.display_fps)))
+
+    def hide_page(self, page):
+        # The stack shows the next page before hiding the previous one
+        if page is not self.page:
+            return
+        self.page = None
+        self.timer.stop()
+        if self.lease is not None:
+            self.lease.release()
+            self.lease = None
+            self.shown_seconds += time.perf_counter() - self.shown_since
+            self.shown_since = None
+            stats = self.stats()
+            if stats['delivered']:
+                print(f"Preview paused: {stats['delivered']} frames shown, "
+                      f"{stats['gui_ms_per_second']:.1f} ms of GUI time per second")
+
+    def tick(self):
+        start = time.perf_counter()
+        page = self.page
+        if page is None or not page.isVisible():
+            self.hide_page(page)
+            return
+
+        self.ticks += 1
+        state = self.lease.state()
+        if state != self.camera_state:
+            self.camera_state = state
+            page.show_camera_state(state)
+
+        if page.capturing:
+            frame, sequence, _ = self.lease.latest()
+            if frame is not None and sequence != self.sequence:
+                self.sequence = sequence
+                page.show_preview(frame)
+                self.delivered += 1
+        self.busy_seconds += time.perf_counter() - start
+
+    def recent(self, count):
+        """The newest count frames from the camera, or [] while no page is shown."""
+        return self.lease.recent(count) if self.lease is not None else []
+
+    def stats(self):
+        shown = self.shown_seconds
+        if self.shown_since is not None:
+            shown += time.perf_counter() - self.shown_since
+        return {
+            "ticks": self.ticks,
+            "delivered": self.delivered,
+            "shown_seconds": shown,
+            "gui_ms_per_second": self.busy_seconds * 1000 / shown if shown > 0 else 0.0,
+        }
+
+
+def set_display_fps(fps):
+    """Preview refresh rate for the dispatcher, set before the first page is shown."""
+    global _display_fps
+    _display_fps = fps
+    if _dispatcher_instance is not None:
+        _dispatcher_instance.display_fps = fps
+
+
+def get_frame_dispatcher():
+    """Get the shared frame dispatcher, creating it on first use (after the QApplication exists)."""
+    global _dispatcher_instance
+
+    if _dispatcher_instance is None:
+        _dispatcher_instance = FrameDispatcher(_display_fps)
+    return _dispatcher_instance
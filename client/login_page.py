@@ -1,12 +1,38 @@
-from PySide6.QtCore import QTimer
-
-from hands.hand_tracker import process_image_with_frame
+from hands.burst_auth import evaluate_burst
+from hands.gesture_index import verify_gesture
 from .auth_page import AuthPage
-from db.handle_db import retrieve_password
+from db.handle_db import retrieve_password, retrieve_template
+
+def check_login(job, username, frames):
+    """Runs on the thread pool: look up the user, evaluate the captured burst and verify it."""
+    password = retrieve_password(username)
+    if not password:
+        return {'status': 'no_user', 'username': username}
+    # Only access password[0] after checking it exists
+    password = password[0]
+
+    # Evaluate the captured burst in parallel and vote on the hash
+    job.progress("Checking gesture...")
+    password_hash = evaluate_burst(frames, username)
+    job.check_cancelled()
+    result = {'username': username, 'password': password, 'burst': password_hash}
+    if password_hash['gesture_hash'] is None:
+        return dict(result, status='no_hand')
+    if not password_hash['quorum_reached']:
+        return dict(result, status='retake')
+
+    template = retrieve_template(username)
+    accepted = verify_gesture(password_hash['gesture_hash'], password_hash['template'], password, template)
+    return dict(result, status='accepted' if accepted else 'rejected')
+
 
 class LoginPage(AuthPage):
     def __init__(self, main_window):
         super().__init__(main_window, page_title="Login")
+        # Rejected gesture attempts, for the rejected-attempts-per-login metric
+        self.rejected_attempts = 0
+        self.total_rejected_attempts = 0
+        self.successful_logins = 0
 
     def submit_image(self):
         username = self.username_edit.text().strip()
@@ -22,35 +48,67 @@ class LoginPage(AuthPage):
             self.submit_button.setEnabled(True)
             return
 
-        self.submit_button.setEnabled(False)
-        print(f"Starting sign up processing for: {username}")
-        
-        password = retrieve_password(username)
-        
+        # Database lookups and MediaPipe run in the background; the result comes back in submit_finished
+        if self.start_submit(check_login, username, self.captured_frames()):
+            print(f"Starting login processing for: {username}")
+
+    def submit_finished(self, result):
+        username = result['username']
+
         # Check if password exists first
-        if not password:
+        if result['status'] == 'no_user':
             self.show_error(f"ERROR: No password found for user '{username}'. Please check the username.")
             print(f"Showing error: No password for {username}")
             self.submit_button.setEnabled(True)
             return
-            
-        # Only access password[0] after checking it exists
-        password = password[0]
-        
-        password_hash = process_image_with_frame(self.frame, username)
-        
-        if (password_hash['gesture_hash'] == password):
-            print('saved pass', password)
-            print('input pass', password_hash['gesture_hash'])
+
+        password_hash = result['burst']
+        print(f"Burst consensus {password_hash['gesture_hash']} with confidence "
+              f"{password_hash['confidence']:.2f} from {password_hash['frames_evaluated']} frames "
+              f"in {password_hash['elapsed_ms']:.0f} ms")
+
+        if result['status'] == 'no_hand':
+            print("Showing error: No hand detected")
+            self.record_login_attempt(accepted=False)
+            self.show_error("ERROR: No hand detected. Please try again.")
+            self.reset_capture()
+            return
+
+        if result['status'] == 'retake':
+            # Not a rejected gesture: the burst just didn't agree
+            print("Showing error: No quorum in the burst")
+            self.show_error("ERROR: The gesture wasn't steady. Please hold it still and try again.")
+            self.reset_capture()
+            return
+
+        print('saved pass', result['password'])
+        print('input pass', password_hash['gesture_hash'])
+        if result['status'] == 'accepted':
             print("Password is correct")
+            self.record_login_attempt(accepted=True)
             self.finish_login(username)
         else:
-            print('saved pass', password)
-            print('input pass', password_hash['gesture_hash'])
             print("Showing error: Password incorrect")
+            self.record_login_attempt(accepted=False)
             self.show_error("ERROR: Hand gesture doesn't match. Please try again.")
             self.reset_capture()
 
+    def record_login_attempt(self, accepted):
+        if not accepted:
+            self.rejected_attempts += 1
+            self.total_rejected_attempts += 1
+            return
+
+        self.successful_logins += 1
+        print(f"Login accepted after {self.rejected_attempts} rejected attempts "
+              f"({self.rejected_per_login():.2f} rejected per successful login)")
+        self.rejected_attempts = 0
+
+    def rejected_per_login(self):
+        if self.successful_logins == 0:
+            return float(self.total_rejected_attempts)
+        return self.total_rejected_attempts / self.successful_logins
+
     def finish_login(self, username):
         print(f"Finished processing login for: {username}")
         # For demonstration, we simulate a successful login by passing dummy data.
@@ -1,17 +1,32 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTableView, QAbstractItemView
+from PySide6.QtCore import Qt, QTimer
+
+from .vault_model import VaultTableModel
+
+# Pause after the last keystroke before the search runs, in ms
+SEARCH_DELAY_MS = 200
 
 class PasswordsPage(QWidget):
     def __init__(self, main_window, user_name):
         super().__init__()
-        print("pwd page", user_name)
         self.main_window = main_window
         self.setWindowTitle("Passwords")
-        # get passwords from the database
-        user_data = [("user1", "password1"), ("user2", "password2")]
-        self.setup_ui(user_data)
+        # Rows are read from the database as the table scrolls
+        self.model = VaultTableModel()
+        self.setup_ui()
+        self.set_user(user_name)
+
+    def set_user(self, user_name):
+        """Show user_name's vault; the page is reused across logins."""
+        print("pwd page", user_name)
+        self.user_name = user_name
+        self.search_edit.blockSignals(True)
+        self.search_edit.clear()
+        self.search_edit.blockSignals(False)
+        self.model.set_owner(user_name)
+        self.table.scrollToTop()
 
-    def setup_ui(self, user_data):
+    def setup_ui(self):
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(10)
@@ -22,14 +37,27 @@ class PasswordsPage(QWidget):
         header.setStyleSheet("font-size: 24px; font-weight: bold;")
         layout.addWidget(header)
 
-        # QTableWidget to display data in a grid with grid lines
-        table = QTableWidget()
-        table.setColumnCount(2)
-        table.setHorizontalHeaderLabels(["Username", "Password"])
+        # Filtering happens in the database, once typing pauses
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search usernames")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        layout.addWidget(self.search_edit)
+
+        # QTableView to display data in a grid with grid lines
+        table = QTableView()
+        table.setModel(self.model)
         table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
         table.setShowGrid(True)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Fixed row heights, so the view never measures rows it isn't showing
+        table.verticalHeader().setDefaultSectionSize(32)
         table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ccc;
                 font-size: 16px;
             }
@@ -39,16 +67,16 @@ class PasswordsPage(QWidget):
                 border: 1px solid #ccc;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border: 1px solid #ccc;
                 padding: 4px;
             }
         """)
-
-        table.setRowCount(len(user_data))
-        for i, (uname, pwd) in enumerate(user_data):
-            table.setItem(i, 0, QTableWidgetItem(uname))
-            table.setItem(i, 1, QTableWidgetItem(pwd))
+        self.table = table
 
         layout.addWidget(table)
-        self.setLayout(layout)
\ No newline at end of file
+        self.setLayout(layout)
+
+    def apply_search(self):
+        self.model.set_search(self.search_edit.text())
+        self.table.scrollToTop()
@@ -1,9 +1,29 @@
-from PySide6.QtCore import QTimer
-
-from hands.hand_tracker import process_image_with_frame
+from hands.burst_auth import evaluate_burst
 from .auth_page import AuthPage
 from db.handle_db import get_user, insert_user
 
+
+def enroll_user(job, username, frames):
+    """Runs on the thread pool: check the username is free, evaluate the burst and store the user."""
+    if get_user(username):
+        return {'status': 'exists', 'username': username}
+
+    # Enroll the hash most of the captured burst agrees on
+    job.progress("Reading gesture...")
+    password_hash = evaluate_burst(frames, username)
+    result = {'username': username, 'burst': password_hash}
+    if password_hash['gesture_hash'] is None:
+        return dict(result, status='no_hand')
+    # A hash fewer than BURST_QUORUM frames agree on would become a permanent password
+    if not password_hash['quorum_reached']:
+        return dict(result, status='retake')
+
+    # Don't store the user if they hit "Retake Image" meanwhile
+    job.check_cancelled()
+    insert_user(username, password_hash['gesture_hash'], password_hash['template'])
+    return dict(result, status='enrolled')
+
+
 class SignupPage(AuthPage):
     def __init__(self, main_window):
         super().__init__(main_window, page_title="Sign Up")
@@ -15,32 +35,41 @@ class SignupPage(AuthPage):
             print("Showing error: Username empty")
             return
 
-        # Disable the submit button to prevent duplicate submissions
-        self.submit_button.setEnabled(False)
-        print(f"Starting login processing for: {username}")
-        
-        user = get_user(username)
-        if user:
-            self.show_error(f"ERROR: User '{username}' already exists. Please use a different username.")
-            print(f"Showing error: User {username} already exists")
-            self.reset_capture()
-            return
-        
         # Check if frame exists using numpy array check
         if self.frame is None or not hasattr(self.frame, 'shape'):
             self.show_error("ERROR: Please capture your hand gesture first.")
             print("Showing error: No frame captured")
             self.submit_button.setEnabled(True)
             return
-            
-        password_hash = process_image_with_frame(self.frame, username)
-        
-        print(username, password_hash['gesture_hash'])
 
-        insert_user(username, password_hash['gesture_hash'])
-        self.finish_signup(username)
+        # The submit button stays disabled while the job runs, and repeat submits are ignored
+        if self.start_submit(enroll_user, username, self.captured_frames()):
+            print(f"Starting sign up processing for: {username}")
 
-        # QTimer.singleShot(2000, lambda: self.finish_login(username))
+    def submit_finished(self, result):
+        username = result['username']
+        if result['status'] == 'exists':
+            self.show_error(f"ERROR: User '{username}' already exists. Please use a different username.")
+            print(f"Showing error: User {username} already exists")
+            self.reset_capture()
+            return
+
+        password_hash = result['burst']
+        print(username, password_hash['gesture_hash'], f"confidence {password_hash['confidence']:.2f}")
+
+        if result['status'] == 'no_hand':
+            self.show_error("ERROR: No hand detected. Please capture your hand gesture again.")
+            print("Showing error: No hand detected")
+            self.reset_capture()
+            return
+
+        if result['status'] == 'retake':
+            self.show_error("ERROR: The gesture wasn't steady. Please hold it still and capture it again.")
+            print("Showing error: No quorum in the burst")
+            self.reset_capture()
+            return
+
+        self.finish_signup(username)
 
     def finish_signup(self, username):
         print(f"Finished processing sign up for: {username}")
@@ -0,0 +1,48 @@
+import importlib
+import threading
+import time
+
+# Startup times are measured from when this module is first imported, which
+# main.py does before anything else
+_start = time.perf_counter()
+
+
+class StartupProfile:
+    """Module import times and startup milestones, for main.py --profile-startup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.imports = []  # (module, started at ms, took ms, thread)
+        self.milestones = []  # (name, at ms, thread)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - _start) * 1000
+
+    def mark(self, name):
+        with self._lock:
+            self.milestones.append((name, self.elapsed_ms(), threading.current_thread().name))
+
+    def timed_import(self, name):
+        """Import a module and record how long it took; modules already imported cost nothing."""
+        started = self.elapsed_ms()
+        module = importlib.import_module(name)
+        took = self.elapsed_ms() - started
+        with self._lock:
+            self.imports.append((name, started, took, threading.current_thread().name))
+        return module
+
+    def report(self):
+        with self._lock:
+            imports = list(self.imports)
+            milestones = sorted(self.milestones, key=lambda milestone: milestone[1])
+        lines = ["Startup profile (ms since launch)", f"  {'import':<28}{'at':>9}{'took':>9}  thread"]
+        for name, started, took, thread in imports:
+            lines.append(f"  {name:<28}{started:9.1f}{took:9.1f}  {thread}")
+        lines.append(f"  {'milestone':<28}{'at':>9}")
+        for name, at, thread in milestones:
+            lines.append(f"  {name:<28}{at:9.1f}{'':9}  {thread}")
+        return "\n".join(lines)
+
+
+# Shared profile for the whole startup
+profile = StartupProfile()
@@ -0,0 +1,96 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from db.handle_db import fetch_vault_page, retrieve_vault_passwords
+
+# Rows read from the database each time the view scrolls near the end
+VAULT_PAGE_SIZE = 200
+
+# Passwords read together when a row without one is painted, about a screenful
+PASSWORD_BATCH = 50
+
+
+class VaultTableModel(QAbstractTableModel):
+    """
+    An owner's saved credentials for a QTableView, read from SQLite as the
+    view scrolls.
+
+    fetchMore() loads the next page of (id, username) rows, filtered in the
+    database by the search text. Passwords are only read when the view
+    paints a row that doesn't have one yet, together with the rows after it.
+    """
+
+    HEADERS = ("Username", "Password")
+
+    def __init__(self, owner=None, page_size=VAULT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.owner = None
+        self.search = ""
+        self.rows = []  # (id, username)
+        self.passwords = {}  # id -> password, for rows that have been painted
+        self.exhausted = True
+        self.set_owner(owner)
+
+    def set_owner(self, owner):
+        """Show another owner's vault, starting unfiltered from the first page."""
+        self.owner = owner
+        self.search = ""
+        self.reset()
+
+    def set_search(self, text):
+        """Only show usernames containing text."""
+        text = text.strip()
+        if text != self.search:
+            self.search = text
+            self.reset()
+
+    def reset(self):
+        self.beginResetModel()
+        self.rows = []
+        self.passwords = {}
+        self.exhausted = self.owner is None
+        self.endResetModel()
+        # The first page right away, so the table isn't blank until the view asks
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        # Not the base implementation: on PySide6 6.12 its empty results break None's refcount
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        entry_id, username = self.rows[index.row()]
+        if index.column() == 0:
+            return username
+        if entry_id not in self.passwords:
+            self.load_passwords(index.row())
+        return self.passwords.get(entry_id)
+
+    def load_passwords(self, row):
+        entry_ids = [entry_id for entry_id, _ in self.rows[row:row + PASSWORD_BATCH]
+                     if entry_id not in self.passwords]
+        self.passwords.update(retrieve_vault_passwords(entry_ids))
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after_id = self.rows[-1][0] if self.rows else 0
+        page = fetch_vault_page(self.owner, after_id, self.page_size, self.search)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
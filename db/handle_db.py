@@ -1,33 +1,67 @@
 import sqlite3
 
+# Database file, relative to the working directory the app is started from
+DB_PATH = 'password_manager.db'
+
 def init_db():
-    conn = sqlite3.connect('password_manager.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            template TEXT
+        );
+    ''')
+
+    # Databases created before gesture templates were stored lack the template
+    # column. Some have a features column with the coarse hashed features,
+    # which are too coarse for tolerant matching and are left unused.
+    cursor.execute('PRAGMA table_info(users)')
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'template' not in columns:
+        cursor.execute('ALTER TABLE users ADD COLUMN template TEXT')
+
+    # Saved credentials, listed per owner in id order
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vault (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner TEXT NOT NULL,
+            username TEXT NOT NULL,
             password TEXT NOT NULL
         );
     ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS vault_owner_id ON vault (owner, id)')
 
     conn.commit()
     conn.close()
 
 
-def insert_user(username, password):
+def serialize_features(features):
+    return ','.join(str(int(feature)) for feature in features)
+
+
+def deserialize_features(text):
+    return [int(feature) for feature in text.split(',')] if text else []
+
+
+def insert_user(username, password, template=None):
     # Ensure username and password are strings
     if not isinstance(username, str) or not isinstance(password, str):
         raise TypeError("Username and password must be strings")
+
+    # The gesture template is stored next to the hash for tolerant matching
+    template = serialize_features(template) if template is not None else None
     
-    conn = sqlite3.connect('password_manager.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     try:
         cursor.execute('''
-            INSERT INTO users (username, password) VALUES (?, ?)
-        ''', (username, password))
+            INSERT INTO users (username, password, template) VALUES (?, ?, ?)
+        ''', (username, password, template))
         conn.commit()
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -37,7 +71,7 @@ def insert_user(username, password):
 
 
 def get_user(username):
-    conn = sqlite3.connect('password_manager.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -49,7 +83,7 @@ def get_user(username):
     return user
 
 def retrieve_password(username):
-    conn = sqlite3.connect('password_manager.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -62,8 +96,79 @@ def retrieve_password(username):
     if password is None:
         return None
     return password
+
+
+def retrieve_template(username):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT template FROM users WHERE username = ?
+    ''', (username,))
+    row = cursor.fetchone()
+
+    conn.close()
+
+    # Users enrolled before templates were stored only have the hash
+    if row is None or row[0] is None:
+        return None
+    return deserialize_features(row[0])
     
 
+def insert_vault_entries(owner, entries):
+    """Save (username, password) pairs to owner's vault."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.executemany('''
+            INSERT INTO vault (owner, username, password) VALUES (?, ?, ?)
+        ''', [(owner, username, password) for username, password in entries])
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+def fetch_vault_page(owner, after_id=0, limit=200, search=None):
+    """
+    Up to limit (id, username) rows of owner's vault with id > after_id, in id
+    order. search keeps usernames containing it. Passwords are left out; see
+    retrieve_vault_passwords.
+    """
+    query = 'SELECT id, username FROM vault WHERE owner = ? AND id > ?'
+    params = [owner, after_id]
+    if search:
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query += " AND username LIKE ? ESCAPE '\\'"
+        params.append(f'%{escaped}%')
+    query += ' ORDER BY id LIMIT ?'
+    params.append(limit)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def retrieve_vault_passwords(entry_ids):
+    """Passwords for the given vault entry ids, as {id: password}."""
+    if not entry_ids:
+        return {}
+    placeholders = ','.join('?' * len(entry_ids))
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT id, password FROM vault WHERE id IN ({placeholders})', list(entry_ids))
+    passwords = dict(cursor.fetchall())
+    conn.close()
+    return passwords
+
+
 def main():
     init_db()
 
@@ -72,6 +177,9 @@ def main():
     print(get_user('admin'))
     print(retrieve_password('admin'))
 
+    insert_vault_entries('admin', [('admin@example.com', 'hunter2')])
+    print(fetch_vault_page('admin', search='example'))
+
 
 if __name__ == '__main__':
     main()
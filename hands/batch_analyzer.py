@@ -0,0 +1,273 @@
+# Non-interactive batch analyzer: re-hashes archived images and videos on a
+# process pool and streams one JSON line per analysed frame.
+#
+#   python -m hands.batch_analyzer videos/ "archive/**/*.png" -o results.jsonl
+#
+# Re-running the same command resumes from the frames already in results.jsonl.
+# The first line records the run's --salt and --every, and a run with
+# different ones is refused unless --restart is given.
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
+
+# Video frames per task, so long videos are spread across workers
+VIDEO_CHUNK_FRAMES = 120
+
+# Queue a worker sends its records to the parent on, one per frame
+_record_queue = None
+
+
+def expand_inputs(inputs):
+    """Resolve directories (recursively), globs and plain files to a sorted list of media files."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files)
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            matches = glob.glob(item, recursive=True)
+            if not matches:
+                print(f"No files match {item}")
+            paths.update(match for match in matches if os.path.isfile(match))
+
+    extensions = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+    return sorted(path for path in paths if os.path.splitext(path)[1].lower() in extensions)
+
+
+def build_tasks(paths, chunk_frames=VIDEO_CHUNK_FRAMES):
+    """One task per image, and one per chunk of frames for videos: (key, path, start, end)."""
+    tasks = []
+    for path in paths:
+        if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+            tasks.append((path, path, 0, 1))
+            continue
+
+        capture = cv2.VideoCapture(path)
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        if frame_count <= 0:
+            # Unknown length, let one worker read it to the end
+            tasks.append((f"{path}#0-", path, 0, None))
+            continue
+        for start in range(0, frame_count, chunk_frames):
+            end = min(start + chunk_frames, frame_count)
+            tasks.append((f"{path}#{start}-{end}", path, start, end))
+    return tasks
+
+
+def _init_worker(record_queue):
+    # Each worker process holds its own warm detector for all of its tasks
+    global _record_queue
+    _record_queue = record_queue
+    from .gesture_pipeline import warm_up_hand_detector
+    warm_up_hand_detector()
+
+
+def _analyse_frame(frame, path, frame_index, salt):
+    from .gesture_pipeline import process_image_with_frame
+
+    start = time.perf_counter()
+    result = process_image_with_frame(frame, salt)
+    return {
+        "path": path,
+        "frame_index": frame_index,
+        "gesture": result["gesture"],
+        "gesture_hash": result["gesture_hash"],
+        "features": result["features"],
+        "template": result["template"],
+        "detect_ms": round(result["timings"]["detect_ms"], 3),
+        "total_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def task_records(task, salt, frame_step=1):
+    """
+    Yield the records for one task as each frame is analysed. A video that
+    ends before the task does also yields {"path", "frame_count"}, so the
+    frames the container claimed past its end aren't waited for on resume.
+    """
+    _, path, start, end = task
+
+    if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+        frame = cv2.imread(path)
+        if frame is None:
+            yield {"path": path, "frame_index": 0, "error": "unreadable image"}
+        else:
+            yield _analyse_frame(frame, path, 0, salt)
+        return
+
+    capture = cv2.VideoCapture(path)
+    if start:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frame_index = start
+    try:
+        while end is None or frame_index < end:
+            success, frame = capture.read()
+            if not success:
+                yield {"path": path, "frame_count": frame_index}
+                break
+            if frame_index % frame_step == 0:
+                yield _analyse_frame(frame, path, frame_index, salt)
+            frame_index += 1
+    finally:
+        capture.release()
+
+
+def analyse_task(task, salt, frame_step=1):
+    """Analyse one task in a worker, sending each record to the parent as it is made. Returns (key, frames)."""
+    frames = 0
+    for record in task_records(task, salt, frame_step):
+        _record_queue.put(record)
+        frames += "frame_index" in record
+    return task[0], frames
+
+
+def load_checkpoint(output):
+    """
+    Read what an earlier run left in output, which doubles as the checkpoint:
+    (run parameters, set of (path, frame_index) done, {path: frame_count} of
+    videos read to the end). The parameters are None for an empty file. A
+    partial last line from an interrupted write is cut off so appending
+    starts on a fresh line.
+    """
+    params = None
+    completed = set()
+    frame_counts = {}
+    if not os.path.exists(output):
+        return params, completed, frame_counts
+
+    with open(output, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if "run" in record:
+            params = record["run"]
+        elif "frame_count" in record:
+            frame_counts[record["path"]] = record["frame_count"]
+        else:
+            completed.add((record.get("path"), record.get("frame_index")))
+    if params is None and (completed or frame_counts):
+        # Written before runs recorded their parameters
+        params = {}
+    return params, completed, frame_counts
+
+
+def _task_frames(task, frame_step, frame_counts):
+    # Frames a task would write records for; None when the video length is unknown
+    _, path, start, end = task
+    if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+        return [(path, 0)]
+    if path in frame_counts:
+        end = frame_counts[path] if end is None else min(end, frame_counts[path])
+    if end is None:
+        return None
+    return [(path, index) for index in range(start, end) if index % frame_step == 0]
+
+
+def _write_records(record_queue, out, completed, written):
+    # Runs on a thread in the parent: append each record as it arrives, until None
+    while True:
+        record = record_queue.get()
+        if record is None:
+            return
+        if "frame_index" in record:
+            # A task cut short by an interruption is re-run; skip the frames it already wrote
+            frame = (record["path"], record["frame_index"])
+            if frame in completed:
+                continue
+            completed.add(frame)
+            written[0] += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+
+def run(inputs, output, salt="user1", workers=None, frame_step=1, chunk_frames=VIDEO_CHUNK_FRAMES, restart=False):
+    """Analyse the inputs into output, resuming an earlier run. Returns the frames written, or None if refused."""
+    params = {"salt": salt, "every": frame_step}
+    if restart and os.path.exists(output):
+        os.remove(output)
+    # Progress is tracked per frame, so resuming works whatever --chunk-frames was
+    previous, completed, frame_counts = load_checkpoint(output)
+    if previous is not None and previous != params:
+        print(f"Error: {output} holds a run with different settings ({previous or 'unrecorded'}); "
+              f"pass --restart to start it over or choose another output file")
+        return None
+
+    tasks = build_tasks(expand_inputs(inputs), chunk_frames)
+    remaining = []
+    for task in tasks:
+        frames = _task_frames(task, frame_step, frame_counts)
+        if frames is None or not completed.issuperset(frames):
+            remaining.append(task)
+    print(f"{len(tasks)} tasks, {len(tasks) - len(remaining)} already done, {len(remaining)} to run")
+    if not remaining:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    written = [0]
+
+    # spawn so workers don't inherit MediaPipe state from the parent process
+    context = multiprocessing.get_context("spawn")
+    with open(output, "a") as out, context.Manager() as manager:
+        if previous is None:
+            out.write(json.dumps({"run": params}) + "\n")
+            out.flush()
+        # Workers send each record as soon as it is made, so an interrupted
+        # run loses at most the frames being analysed
+        record_queue = manager.Queue()
+        writer = threading.Thread(target=_write_records, args=(record_queue, out, completed, written))
+        writer.start()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(record_queue,)) as pool:
+                futures = [pool.submit(analyse_task, task, salt, frame_step) for task in remaining]
+                for done, future in enumerate(as_completed(futures), 1):
+                    key, frames = future.result()
+                    elapsed = time.perf_counter() - start
+                    print(f"[{done}/{len(remaining)}] {key}: {frames} frames "
+                          f"({written[0] / elapsed:.1f} frames/s)")
+        finally:
+            record_queue.put(None)
+            writer.join()
+
+    return written[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-hash archived gesture images and videos.")
+    parser.add_argument("inputs", nargs="+", help="image/video files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="gesture_hashes.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--salt", default="user1", help="salt (username) to hash with")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--every", type=int, default=1, help="only analyse every Nth video frame")
+    parser.add_argument("--chunk-frames", type=int, default=VIDEO_CHUNK_FRAMES,
+                        help="video frames per task")
+    parser.add_argument("--restart", action="store_true", help="discard the output file's earlier results")
+    args = parser.parse_args(argv)
+
+    frames = run(args.inputs, args.output, args.salt, args.workers, args.every, args.chunk_frames, args.restart)
+    return 0 if frames is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
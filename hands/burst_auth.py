@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .detectors import open_hand_detector
+from .gesture_pipeline import process_image_with_frame
+
+# Frames grabbed per burst, and how many of them must agree on a hash
+BURST_SIZE = 5
+BURST_QUORUM = 3
+
+# Worker threads evaluating frames. MediaPipe releases the GIL while a graph
+# runs, so each worker gets its own detector (from the selected backend) and
+# frames really run in parallel.
+BURST_WORKERS = 3
+
+# Worker pool and the per-thread detectors it created
+_executor = None
+_executor_lock = threading.Lock()
+_worker_local = threading.local()
+_worker_detectors = []
+
+
+def _worker_detector():
+    detector = getattr(_worker_local, "detector", None)
+    if detector is None:
+        detector = open_hand_detector()
+        _worker_local.detector = detector
+        with _executor_lock:
+            _worker_detectors.append(detector)
+    return detector
+
+
+def _evaluate_frame(frame, user_name):
+    return process_image_with_frame(frame, user_name, detector=_worker_detector())
+
+
+def get_burst_executor():
+    """Get the shared worker pool, creating it on first use."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BURST_WORKERS, thread_name_prefix="burst")
+    return _executor
+
+
+def warm_up_burst_workers():
+    """
+    Initialise a detector on every worker thread in the background.
+    A barrier holds each warm-up task until all workers have one, so no
+    thread picks up two. Returns the futures without waiting on them.
+    """
+    barrier = threading.Barrier(BURST_WORKERS)
+
+    def warm_up():
+        try:
+            barrier.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        _worker_detector().warm_up()
+
+    executor = get_burst_executor()
+    return [executor.submit(warm_up) for _ in range(BURST_WORKERS)]
+
+
+def release_burst_workers():
+    """Stop the worker pool and close its detectors when the application is closing."""
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+        detectors = list(_worker_detectors)
+        _worker_detectors.clear()
+
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    for detector in detectors:
+        detector.close()
+
+
+def evaluate_burst(frames, user_name, quorum=BURST_QUORUM):
+    """
+    Hash a burst of frames on the worker pool and vote on the result.
+
+    Evaluation stops as soon as quorum frames agree on a hash; frames still
+    queued are cancelled. Returns the consensus "gesture_hash" and its
+    "features" and "template" (None if no frame had a hand), "confidence"
+    (share of evaluated frames that voted for it), "quorum_reached", the
+    "votes" Counter, "frames_evaluated" and the wall-clock "elapsed_ms".
+
+    Without a quorum the most common hash is still returned for logging, but
+    it is only a plurality; callers should ask for a retake instead of using it.
+    """
+    start = time.perf_counter()
+    executor = get_burst_executor()
+    pending = {executor.submit(_evaluate_frame, frame, user_name) for frame in frames}
+
+    votes = Counter()
+    results_by_hash = {}
+    frames_evaluated = 0
+    quorum_reached = False
+
+    while pending and not quorum_reached:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            frames_evaluated += 1
+            gesture_hash = result["gesture_hash"]
+            if gesture_hash is None:
+                continue
+            votes[gesture_hash] += 1
+            results_by_hash.setdefault(gesture_hash, result)
+            if votes[gesture_hash] >= quorum:
+                quorum_reached = True
+
+    for future in pending:
+        future.cancel()
+
+    consensus_hash = votes.most_common(1)[0][0] if votes else None
+    confidence = votes[consensus_hash] / frames_evaluated if consensus_hash else 0.0
+
+    consensus = results_by_hash.get(consensus_hash, {})
+    return {
+        "gesture_hash": consensus_hash,
+        "features": consensus.get("features"),
+        "template": consensus.get("template"),
+        "confidence": confidence,
+        "quorum_reached": quorum_reached,
+        "votes": votes,
+        "frames_evaluated": frames_evaluated,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
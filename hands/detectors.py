@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from typing import Protocol
+
+import numpy as np
+
+from .landmark_frame import LandmarkFrame, NUM_LANDMARKS
+
+# Environment variable selecting the detector backend, e.g.
+#   HAND_DETECTOR=fake:5 python main.py --source synthetic
+HAND_DETECTOR_ENV = "HAND_DETECTOR"
+
+# Poses generated for the fake backend when no recording is given
+SYNTHETIC_POSES = 32
+
+
+class HandDetection:
+    """
+    Result of one detect() call: a LandmarkFrame and handedness label per
+    hand, the backend's own landmark objects for drawing (MediaPipe only), and
+    timings in milliseconds.
+    """
+
+    __slots__ = ("landmarks", "handedness", "hand_landmarks", "timings")
+
+    def __init__(self, landmarks=(), handedness=(), hand_landmarks=(), timings=None):
+        self.landmarks = list(landmarks)
+        self.handedness = list(handedness)
+        self.hand_landmarks = list(hand_landmarks)
+        self.timings = timings or {}
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def __repr__(self):
+        return f"HandDetection(hands={len(self)}, timings={self.timings})"
+
+
+class HandDetector(Protocol):
+    """What the login/signup, burst and batch paths need from a hand detector."""
+
+    def detect(self, frame) -> HandDetection:
+        """Find hands in a BGR camera frame (mirrored like the preview)."""
+        ...
+
+    def warm_up(self, width=640, height=480):
+        ...
+
+    def timings(self) -> dict:
+        ...
+
+    def close(self):
+        ...
+
+
+def make_synthetic_poses(count=SYNTHETIC_POSES, seed=0):
+    """Deterministic (count, 21, 3) landmark sets in MediaPipe's normalized image coordinates."""
+    rng = np.random.default_rng(seed)
+    wrist = rng.uniform(0.3, 0.7, size=(count, 1, 3))
+    poses = wrist + rng.normal(0.0, 0.1, size=(count, NUM_LANDMARKS, 3))
+    poses[:, 0] = wrist[:, 0]
+    return poses.astype(np.float32)
+
+
+class FakeHandDetector:
+    """
+    Deterministic stand-in for MediaPipe that ignores the frame and replays
+    recorded or synthetic landmarks in order, one pose per detect() call,
+    after sleeping latency_ms. Lets the hashing, DB and GUI paths be
+    load-tested without running a model.
+    """
+
+    def __init__(self, poses=None, latency_ms=0.0, handedness="Right", loop=True):
+        if poses is None:
+            poses = make_synthetic_poses()
+        elif isinstance(poses, str):
+            poses = np.load(poses)
+        self.poses = np.asarray(poses, dtype=np.float32)
+        if self.poses.ndim != 3 or self.poses.shape[1:] != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Expected poses of shape (N, {NUM_LANDMARKS}, 3), got {self.poses.shape}")
+        self.latency_ms = latency_ms
+        self.handedness = handedness
+        self.loop = loop
+
+        self._lock = threading.Lock()
+        self._index = 0
+        self.process_count = 0
+        self.total_process_ms = 0.0
+        self.last_process_ms = None
+
+    def _next_pose(self):
+        with self._lock:
+            if self._index >= len(self.poses):
+                if not self.loop or len(self.poses) == 0:
+                    return None
+                self._index = 0
+            pose = self.poses[self._index]
+            self._index += 1
+            return pose
+
+    def detect(self, frame):
+        start = time.perf_counter()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        pose = self._next_pose()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.process_count += 1
+            self.total_process_ms += elapsed_ms
+            self.last_process_ms = elapsed_ms
+
+        if pose is None:
+            return HandDetection(timings={"detect_ms": elapsed_ms})
+        landmarks = LandmarkFrame(pose, self.handedness)
+        return HandDetection([landmarks], [self.handedness], timings={"detect_ms": elapsed_ms})
+
+    def warm_up(self, width=640, height=480):
+        pass
+
+    def timings(self):
+        return {
+            "init_ms": 0.0,
+            "last_process_ms": self.last_process_ms,
+            "warm_mean_ms": self.total_process_ms / self.process_count if self.process_count else None,
+            "process_count": self.process_count,
+        }
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"FakeHandDetector(poses={len(self.poses)}, latency_ms={self.latency_ms})"
+
+
+# Backend used for new detectors; None means $HAND_DETECTOR or MediaPipe
+_backend_spec = None
+
+
+def set_hand_detector_backend(spec):
+    """Select the backend (see open_hand_detector) before any detector is created."""
+    global _backend_spec
+    _backend_spec = spec
+
+
+def open_hand_detector(spec=None):
+    """
+    Create a detector from a spec string. Without a spec, the backend from
+    set_hand_detector_backend, then $HAND_DETECTOR, then MediaPipe is used. Specs:
+      mediapipe
+      fake, fake:<latency ms>                  synthetic poses
+      replay:<poses.npy>, replay:<poses.npy>@<latency ms>
+    """
+    spec = spec or _backend_spec or os.environ.get(HAND_DETECTOR_ENV) or "mediapipe"
+    kind, _, arg = spec.partition(":")
+
+    if kind == "mediapipe":
+        from .hand_tracker import HandDetectorService
+        return HandDetectorService()
+    if kind == "fake":
+        return FakeHandDetector(latency_ms=float(arg) if arg else 0.0)
+    if kind == "replay":
+        path, _, latency = arg.partition("@")
+        return FakeHandDetector(path, latency_ms=float(latency) if latency else 0.0)
+    raise ValueError(f"Unknown hand detector backend {spec!r}")
@@ -1,83 +1,63 @@
 import numpy as np
 
+from .landmark_frame import as_landmark_array
+
 def normalize_landmarks(landmarks):
+    points = as_landmark_array(landmarks)
+
     # Use wrist as origin
-    wrist = landmarks[0]
-    
+    relative = points - points[0]
+
     # Find the furthest point from wrist to determine scale
-    max_dist = 0
-    for lm in landmarks:
-        dist = ((lm.x - wrist.x)**2 + (lm.y - wrist.y)**2 + (lm.z - wrist.z)**2)**0.5
-        max_dist = max(max_dist, dist)
-    
+    max_dist = np.sqrt((relative ** 2).sum(axis=1)).max()
+
     if max_dist == 0:  # Avoid division by zero
         max_dist = 1
-    
+
     # Normalize all points relative to wrist and scale
-    normalized = []
-    for lm in landmarks:
-        normalized.append({
-            'x': (lm.x - wrist.x) / max_dist,
-            'y': (lm.y - wrist.y) / max_dist,
-            'z': (lm.z - wrist.z) / max_dist
-        })
-    
-    return normalized
+    return relative / max_dist
+
+# Define finger joint indices - (base, middle, tip) for each finger
+FINGER_JOINTS = [
+    (1, 2, 4),    # Thumb base to tip
+    (5, 6, 8),    # Index base to tip
+    (9, 10, 12),  # Middle base to tip
+    (13, 14, 16), # Ring base to tip
+    (17, 18, 20), # Pinky base to tip
+    (0, 5, 17),   # Palm width (wrist to index to pinky)
+    (5, 9, 13),   # Knuckle line (index to middle to ring)
+    (9, 13, 17)   # Knuckle line (middle to ring to pinky)
+]
+
+# (tip, joint, axis) for the extended/not-extended finger states.
+# The thumb compares x (tip left of IP joint), the other fingers compare y.
+FINGER_STATE_JOINTS = [
+    (4, 3, 0),    # Thumb
+    (8, 6, 1),    # Index
+    (12, 10, 1),  # Middle
+    (16, 14, 1),  # Ring
+    (20, 18, 1),  # Pinky
+]
+
+# Angle bins used for the hashed features. With a single bin the joint angles
+# never change the hash; only the finger states do.
+FEATURE_ANGLE_BINS = 1
+
+# Angle bins (15 degrees each) for the matching template stored next to the
+# hash. A pose that jitters across a bin edge is one bin away, which a
+# distance threshold can tolerate where the hash cannot.
+TEMPLATE_ANGLE_BINS = 12
+
+# A finger state counts this much in the template's L1 distance, more than any
+# match tolerance, so a bent or straightened finger is never a near match.
+TEMPLATE_STATE_WEIGHT = TEMPLATE_ANGLE_BINS
+_TEMPLATE_BIN_EDGES = np.linspace(0, np.pi, TEMPLATE_ANGLE_BINS + 1)
 
 def calculate_finger_angles(landmarks):
-    angles = []
-    
-    # Define finger joint indices - (base, middle, tip) for each finger
-    finger_joints = [
-        (1, 2, 4),    # Thumb base to tip
-        (5, 6, 8),    # Index base to tip
-        (9, 10, 12),  # Middle base to tip
-        (13, 14, 16), # Ring base to tip
-        (17, 18, 20), # Pinky base to tip
-        (0, 5, 17),   # Palm width (wrist to index to pinky)
-        (5, 9, 13),   # Knuckle line (index to middle to ring)
-        (9, 13, 17)   # Knuckle line (middle to ring to pinky)
-    ]
-    
-    for base_idx, mid_idx, tip_idx in finger_joints:
-        # Get the three points to form an angle
-        base = landmarks[base_idx]
-        mid = landmarks[mid_idx]
-        tip = landmarks[tip_idx]
-        
-
-        v1 = np.array([mid.x - base.x, mid.y - base.y, mid.z - base.z])
-        v2 = np.array([tip.x - mid.x, tip.y - mid.y, tip.z - mid.z])
-        
-
-        v1_norm = np.linalg.norm(v1)
-        v2_norm = np.linalg.norm(v2)
-        
-        if v1_norm == 0 or v2_norm == 0:
-            angles.append(0)
-            continue
-            
-        v1 = v1 / v1_norm
-        v2 = v2 / v2_norm
-        
-        # Calculate angle
-        dot_product = np.clip(np.dot(v1, v2), -1.0, 1.0)
-        angle = np.arccos(dot_product)
-        angles.append(angle)
-    
-    # Add relative finger positions (extended or not)
-    # Thumb
-    angles.append(1.0 if landmarks[4].x < landmarks[3].x else 0.0)
-    # Index
-    angles.append(1.0 if landmarks[8].y < landmarks[6].y else 0.0)
-    # Middle
-    angles.append(1.0 if landmarks[12].y < landmarks[10].y else 0.0)
-    # Ring
-    angles.append(1.0 if landmarks[16].y < landmarks[14].y else 0.0)
-    # Pinky
-    angles.append(1.0 if landmarks[20].y < landmarks[18].y else 0.0)
+    points = as_landmark_array(landmarks)
     
-    return angles
+    # 8 joint angles followed by the 5 finger states (extended or not)
+    return calculate_finger_angles_batch(points[np.newaxis])[0].tolist()
 
 def quantize_features(features, num_bins=5):
     # Pre-defined bin edges for more consistent quantization
@@ -108,17 +88,140 @@ def create_hash_from_features(features):
     
     return format(hash_val, 'x')[:8]  # Return 8-character hex string
 
-def get_gesture_hash(landmarks, salt=""):
-    
+def get_gesture_features(landmarks):
+    # Quantized (unsalted) features that get hashed
+    return features_from_angles(calculate_finger_angles(landmarks))
+
+def features_from_angles(angles):
+    # The hashed features for the output of calculate_finger_angles
+    return [int(feature) for feature in quantize_features(angles, num_bins=FEATURE_ANGLE_BINS)]
+
+def template_from_angles(angles):
+    # Same bins as quantize_features with TEMPLATE_ANGLE_BINS, then the weighted finger states
+    angles = np.asarray(angles, dtype=np.float64)
+    angle_bins = np.digitize(angles[:-5], _TEMPLATE_BIN_EDGES) - 1
+    angle_bins = np.clip(angle_bins, 0, TEMPLATE_ANGLE_BINS - 1)
+    states = (angles[-5:] >= 0.5) * TEMPLATE_STATE_WEIGHT
+    return angle_bins.tolist() + states.tolist()
+
+def get_gesture_template(landmarks):
+    # Higher-resolution (unsalted) template for tolerant matching; the hash uses get_gesture_features
+    return template_from_angles(calculate_finger_angles(landmarks))
+
+def get_gesture_features_and_template(landmarks):
+    """The hashed features and the matching template, from one angle calculation."""
     angles = calculate_finger_angles(landmarks)
-    
-    quantized_features = quantize_features(angles, num_bins=1)
+    return features_from_angles(angles), template_from_angles(angles)
+
+def hash_gesture_features(quantized_features, salt=""):
     
     feature_hash = create_hash_from_features(quantized_features)
     
     # Apply salt to make it more secure per user
     if salt:
-        salted_features = quantized_features + [ord(c) % 5 for c in salt[:3]]
+        salted_features = list(quantized_features) + [ord(c) % 5 for c in salt[:3]]
         return create_hash_from_features(salted_features)
     else:
-        return feature_hash
\ No newline at end of file
+        return feature_hash
+
+def get_gesture_hash(landmarks, salt=""):
+    
+    quantized_features = get_gesture_features(landmarks)
+    
+    return hash_gesture_features(quantized_features, salt)
+
+def calculate_finger_angles_batch(landmarks):
+    """
+    Vectorized calculate_finger_angles for an (N, 21, 3) array of landmarks.
+    Returns an (N, 13) float64 array: 8 joint angles followed by 5 finger states.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    joints = np.array(FINGER_JOINTS)
+
+    base = landmarks[:, joints[:, 0]]
+    mid = landmarks[:, joints[:, 1]]
+    tip = landmarks[:, joints[:, 2]]
+
+    v1 = mid - base
+    v2 = tip - mid
+    v1_norm = np.sqrt(np.einsum("nji,nji->nj", v1, v1))
+    v2_norm = np.sqrt(np.einsum("nji,nji->nj", v2, v2))
+
+    # Degenerate joints get an angle of 0, same as the per-frame path
+    valid = (v1_norm != 0) & (v2_norm != 0)
+    v1 = v1 / np.where(valid, v1_norm, 1)[..., None]
+    v2 = v2 / np.where(valid, v2_norm, 1)[..., None]
+    dot_product = np.clip(np.einsum("nji,nji->nj", v1, v2), -1.0, 1.0)
+    angles = np.where(valid, np.arccos(dot_product), 0.0)
+
+    tips, pips, axes = np.array(FINGER_STATE_JOINTS).T
+    states = (landmarks[:, tips, axes] < landmarks[:, pips, axes]).astype(np.float64)
+
+    return np.concatenate([angles, states], axis=1)
+
+def quantize_features_batch(features, num_bins=5):
+    # Same bins as quantize_features, applied to whole columns at once
+    features = np.asarray(features, dtype=np.float64)
+    angle_bins = np.linspace(0, np.pi, num_bins + 1)
+    finger_state_bins = np.array([0, 0.5, 1])
+
+    angles = np.digitize(features[:, :-5], angle_bins) - 1
+    states = np.digitize(features[:, -5:], finger_state_bins) - 1
+    angles = np.clip(angles, 0, len(angle_bins) - 2)
+    states = np.clip(states, 0, len(finger_state_bins) - 2)
+
+    return np.concatenate([angles, states], axis=1).astype(np.uint64)
+
+def create_hashes_from_features_batch(features, lengths=None):
+    """
+    Rolling hash of create_hash_from_features over each row of an (N, F) integer array.
+    If lengths is given, row i only hashes its first lengths[i] columns.
+    Returns the raw uint64 hash values.
+    """
+    features = np.asarray(features, dtype=np.uint64)
+    hash_vals = np.zeros(len(features), dtype=np.uint64)
+    for col in range(features.shape[1]):
+        # hash_val < 2**32, so hash_val * 31 + feature cannot overflow uint64
+        updated = (hash_vals * np.uint64(31) + features[:, col]) & np.uint64(0xFFFFFFFF)
+        if lengths is None:
+            hash_vals = updated
+        else:
+            hash_vals = np.where(col < lengths, updated, hash_vals)
+    return hash_vals
+
+def get_gesture_hashes_batch(landmarks, salts=""):
+    """
+    Batch version of get_gesture_hash for an (N, 21, 3) array of landmarks
+    or a sequence of LandmarkFrames.
+
+    salts can be a single string applied to every frame or a sequence of N strings.
+    Returns a list of N hashes, identical to calling get_gesture_hash on each frame.
+    """
+    if not isinstance(landmarks, np.ndarray):
+        landmarks = [as_landmark_array(frame) for frame in landmarks] or np.empty((0, 21, 3))
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.ndim != 3 or landmarks.shape[1:] != (21, 3):
+        raise ValueError(f"Expected landmarks of shape (N, 21, 3), got {landmarks.shape}")
+
+    count = len(landmarks)
+    if isinstance(salts, str):
+        salts = [salts] * count
+    elif len(salts) != count:
+        raise ValueError(f"Expected {count} salts, got {len(salts)}")
+
+    angles = calculate_finger_angles_batch(landmarks)
+    quantized_features = quantize_features_batch(angles, num_bins=FEATURE_ANGLE_BINS)
+
+    # Append up to 3 salt features per frame; frames with shorter salts stop hashing early
+    salt_features = np.zeros((count, 3), dtype=np.uint64)
+    salt_lengths = np.zeros(count, dtype=np.int64)
+    for i, salt in enumerate(salts):
+        codes = [ord(c) % 5 for c in salt[:3]]
+        salt_features[i, :len(codes)] = codes
+        salt_lengths[i] = len(codes)
+
+    salted_features = np.concatenate([quantized_features, salt_features], axis=1)
+    lengths = quantized_features.shape[1] + salt_lengths
+    hash_vals = create_hashes_from_features_batch(salted_features, lengths)
+
+    return [format(int(hash_val), 'x')[:8] for hash_val in hash_vals]
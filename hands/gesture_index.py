@@ -0,0 +1,144 @@
+# Default L1 distance allowed between an attempt's template and an enrolled
+# one (see gesture_conversions.get_gesture_template). Angles are 15 degree
+# bins, so this is up to 60 degrees of drift across the 8 joint angles; a
+# flipped finger costs TEMPLATE_STATE_WEIGHT on its own and never matches.
+MATCH_TOLERANCE = 4
+
+# Tolerance for login verification
+LOGIN_MATCH_TOLERANCE = MATCH_TOLERANCE
+
+
+def feature_distance(features_a, features_b):
+    """L1 distance between two quantized feature vectors of the same length."""
+    if len(features_a) != len(features_b):
+        raise ValueError(f"Feature vectors differ in length: {len(features_a)} != {len(features_b)}")
+    return sum(abs(a - b) for a, b in zip(features_a, features_b))
+
+
+def features_match(features, template, tolerance=MATCH_TOLERANCE):
+    return feature_distance(features, template) <= tolerance
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over quantized feature vectors with the integer L1 metric.
+    Lookups within a small tolerance only visit children whose edge distance is in
+    [d - tolerance, d + tolerance], so most of the tree is pruned.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, features, item):
+        features = tuple(features)
+        node = (features, [item], {})
+        self.size += 1
+
+        if self.root is None:
+            self.root = node
+            return
+
+        current = self.root
+        while True:
+            distance = feature_distance(features, current[0])
+            if distance == 0:
+                # Same template, keep every item registered under it
+                current[1].append(item)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, features, tolerance):
+        """Return (distance, item) pairs within tolerance, closest first."""
+        if self.root is None:
+            return []
+
+        features = tuple(features)
+        found = []
+        pending = [self.root]
+        while pending:
+            node_features, items, children = pending.pop()
+            distance = feature_distance(features, node_features)
+            if distance <= tolerance:
+                found.extend((distance, item) for item in items)
+            for edge, child in children.items():
+                if distance - tolerance <= edge <= distance + tolerance:
+                    pending.append(child)
+
+        found.sort(key=lambda match: match[0])
+        return found
+
+    def __len__(self):
+        return self.size
+
+
+class GestureIndex:
+    """
+    Registered gestures indexed for matching: the nearest enrolled template
+    within the tolerance, from a BK-tree. Entries without a template (saved
+    before templates were stored) can only match on their exact hash, from an
+    inverted hash -> names index.
+    """
+
+    def __init__(self, tolerance=MATCH_TOLERANCE):
+        self.tolerance = tolerance
+        self.by_hash = {}
+        self.hash_only = {}  # hash -> names of entries without a template
+        self.tree = BKTree()
+
+    @classmethod
+    def from_registered(cls, registered_gestures, tolerance=MATCH_TOLERANCE):
+        """Build an index from a dict of name -> hash or {"hash", "template"} entries."""
+        index = cls(tolerance)
+        for name, entry in registered_gestures.items():
+            if isinstance(entry, dict):
+                index.add(name, entry["hash"], entry.get("template"))
+            else:
+                index.add(name, entry)
+        return index
+
+    def add(self, name, gesture_hash, template=None):
+        self.by_hash.setdefault(gesture_hash, []).append(name)
+        if template is not None:
+            self.tree.add(template, name)
+        else:
+            self.hash_only.setdefault(gesture_hash, []).append(name)
+
+    def match(self, gesture_hash, template=None):
+        """
+        Return the name of the matching gesture, or None. With a template the
+        closest enrolled template decides; a matching hash alone is not enough,
+        since the hash ignores the joint angles.
+        """
+        if template is None:
+            names = self.by_hash.get(gesture_hash)
+        else:
+            matches = self.tree.search(template, self.tolerance)
+            if matches:
+                return matches[0][1]
+            names = self.hash_only.get(gesture_hash)
+        return names[0] if names else None
+
+    def names_for_hash(self, gesture_hash):
+        return list(self.by_hash.get(gesture_hash, ()))
+
+
+def verify_gesture(gesture_hash, template, enrolled_hash, enrolled_template=None,
+                   tolerance=LOGIN_MATCH_TOLERANCE):
+    """
+    Check a login attempt against one user's enrollment. With a stored
+    template the attempt's template must be within tolerance of it, which
+    also requires the same finger states; users enrolled before templates
+    were stored are checked on the exact hash.
+    """
+    if gesture_hash is None:
+        return False
+    if not enrolled_template:
+        return gesture_hash == enrolled_hash
+    if template is None or len(template) != len(enrolled_template):
+        return False
+    return features_match(template, enrolled_template, tolerance)
@@ -0,0 +1,130 @@
+import numpy as np
+
+from .gesture_conversions import (
+    FEATURE_ANGLE_BINS,
+    FINGER_JOINTS,
+    FINGER_STATE_JOINTS,
+    TEMPLATE_ANGLE_BINS,
+    calculate_finger_angles_batch,
+    features_from_angles,
+    hash_gesture_features,
+    template_from_angles,
+)
+from .gesture_pipeline import classify_gesture
+from .landmark_frame import as_landmark_array
+
+# Landmark indices and interior bin edges for the bounds, computed once
+_BONE_BASE, _BONE_MID, _BONE_TIP = (list(column) for column in zip(*FINGER_JOINTS))
+_STATE_TIPS, _STATE_JOINTS, _STATE_AXES = np.array(FINGER_STATE_JOINTS).T
+_FEATURE_EDGES = np.linspace(0, np.pi, FEATURE_ANGLE_BINS + 1)[1:-1]
+_TEMPLATE_EDGES = np.linspace(0, np.pi, TEMPLATE_ANGLE_BINS + 1)[1:-1]
+
+
+class GestureMemo:
+    """
+    Remembers the gesture, features, template and hash of the last landmarks
+    seen on one stream (e.g. one tracked hand) and reuses them while the hand
+    holds still.
+
+    A cached result is reused only when no landmark has moved far enough to
+    change a quantized feature:
+
+    - Each finger state (and the classification, which uses the same tests)
+      compares one coordinate of two landmarks. If every landmark moves at
+      most d, their difference changes by at most 2d, so the state cannot
+      flip while 2d is smaller than the cached difference.
+    - A joint angle is between two bone vectors. Moving both ends of a bone of
+      length L by at most d turns it by at most asin(2d / L), so the angle
+      cannot cross a bin edge while the two turns add up to less than its
+      distance to the nearest edge.
+
+    The template's angle bins are finer than the hashed features', so they are
+    checked separately: when only a template bin could have changed, just the
+    template is recomputed and the hash is reused.
+
+    d is the largest Euclidean distance any landmark moved since the cached
+    result was computed, so the result is exactly what recomputing would give.
+    """
+
+    def __init__(self, salt=""):
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+        self.template_refreshes = 0
+        self.reset()
+
+    def reset(self):
+        self._points = None
+        self._result = None
+
+    def lookup(self, landmarks):
+        """Return {"gesture", "features", "template", "gesture_hash"} for the landmarks, from cache if still valid."""
+        points = as_landmark_array(landmarks)
+        if self._points is not None:
+            movement = np.sqrt(((points - self._points) ** 2).sum(axis=1)).max()
+            if self._still_valid(movement, self._feature_gaps):
+                self.hits += 1
+                if not self._still_valid(movement, self._template_gaps):
+                    # The template's finer bins may have changed; the hash can't have
+                    self.template_refreshes += 1
+                    angles = self._remember(points)
+                    self._result = dict(self._result, template=template_from_angles(angles))
+                return self._result
+
+        self.misses += 1
+        angles = self._remember(points)
+        features = features_from_angles(angles)
+        self._result = {
+            "gesture": classify_gesture(points),
+            "features": features,
+            "template": template_from_angles(angles),
+            "gesture_hash": hash_gesture_features(features, salt=self.salt),
+        }
+        return self._result
+
+    def _remember(self, points):
+        # Returns calculate_finger_angles for the points, which the bounds are based on
+        self._points = points.copy()
+        points = points.astype(np.float64)
+        angles = calculate_finger_angles_batch(points[np.newaxis])[0]
+
+        # Finger states: a flip needs 2 * movement >= |tip - joint| on that axis
+        self._state_margin = np.abs(points[_STATE_TIPS, _STATE_AXES] - points[_STATE_JOINTS, _STATE_AXES]).min() / 2
+
+        # Joint angles: bone lengths and, for the hashed features and the
+        # template, the distance to the nearest interior bin edge
+        base, mid, tip = points[_BONE_BASE], points[_BONE_MID], points[_BONE_TIP]
+        self._bone_lengths = (np.linalg.norm(mid - base, axis=1), np.linalg.norm(tip - mid, axis=1))
+        joint_angles = angles[:len(FINGER_JOINTS)]
+        self._feature_gaps = self._edge_gaps(joint_angles, _FEATURE_EDGES)
+        self._template_gaps = self._edge_gaps(joint_angles, _TEMPLATE_EDGES)
+        return angles
+
+    @staticmethod
+    def _edge_gaps(angles, edges):
+        if not len(edges):
+            return None
+        return np.abs(angles[:, None] - edges[None, :]).min(axis=1)
+
+    def _still_valid(self, movement, edge_gaps):
+        if not movement < self._state_margin:
+            return False
+        if edge_gaps is None:
+            return True
+
+        reach = 2 * movement
+        lengths1, lengths2 = self._bone_lengths
+        if (lengths1 <= reach).any() or (lengths2 <= reach).any():
+            # A bone this short could point anywhere, including degenerate joints
+            return False
+        turn = np.arcsin(reach / lengths1) + np.arcsin(reach / lengths2)
+        return bool((turn < edge_gaps).all())
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "template_refreshes": self.template_refreshes,
+                "hit_rate": self.hit_rate}
@@ -0,0 +1,163 @@
+# Hashing path shared by login, signup, bursts and batch analysis. It only
+# needs a detectors.HandDetector, so nothing here imports MediaPipe; the
+# MediaPipe backend and drawing live in hand_tracker.
+import threading
+
+import cv2
+
+from .detectors import open_hand_detector
+from .gesture_conversions import get_gesture_features_and_template, hash_gesture_features
+from .landmark_frame import as_landmark_array
+
+# Render modes for the processing functions
+RENDER_NONE = "none"  # hash only, nothing is drawn (login/signup)
+RENDER_LANDMARKS = "landmarks"  # mirrored frame with the hand skeleton
+RENDER_HUD = "hud"  # landmarks plus gesture/hash text
+RENDER_MODES = (RENDER_NONE, RENDER_LANDMARKS, RENDER_HUD)
+
+
+# Singleton detector instance
+_detector_instance = None
+_detector_lock = threading.Lock()
+
+
+def get_hand_detector():
+    """
+    Get the shared hand detector. Creates it (without initialising the graph) if
+    needed, from the backend selected with detectors.set_hand_detector_backend.
+    """
+    global _detector_instance
+
+    with _detector_lock:
+        if _detector_instance is None:
+            _detector_instance = open_hand_detector()
+    return _detector_instance
+
+
+def warm_up_hand_detector():
+    """Initialise the shared detector ahead of the first login or signup."""
+    detector = get_hand_detector()
+    detector.warm_up()
+    print(f"Hand detector warmed up: {detector.timings()}")
+
+
+def release_hand_detector():
+    """Release the shared detector when the application is closing."""
+    global _detector_instance
+
+    with _detector_lock:
+        if _detector_instance is not None:
+            _detector_instance.close()
+            _detector_instance = None
+
+
+def classify_gesture(landmarks):
+    """
+    Classify the gesture based on the relative positions of hand landmarks.
+    Uses a simple heuristic:
+      - Thumb: considered extended if tip is to the left of the IP joint (for right hand).
+      - Other fingers: considered extended if tip is above (smaller y) than the PIP joint.
+    Accepts a LandmarkFrame, a (21, 3) array or a list of MediaPipe landmarks.
+    """
+    points = as_landmark_array(landmarks)
+
+    # Thumb: points[4] is the tip, points[3] is the IP joint (column 0 is x).
+    thumb_extended = points[4, 0] < points[3, 0]
+
+    # For fingers: if the tip is above the PIP joint, consider the finger extended (column 1 is y).
+    # Index finger: tip is points[8], PIP is points[6]
+    index_extended = points[8, 1] < points[6, 1]
+    # Middle finger: tip is points[12], PIP is points[10]
+    middle_extended = points[12, 1] < points[10, 1]
+    # Ring finger: tip is points[16], PIP is points[14]
+    ring_extended = points[16, 1] < points[14, 1]
+    # Pinky: tip is points[20], PIP is points[18]
+    pinky_extended = points[20, 1] < points[18, 1]
+
+    fingers = [
+        thumb_extended,
+        index_extended,
+        middle_extended,
+        ring_extended,
+        pinky_extended,
+    ]
+    count = sum(fingers)
+
+    # Classify gesture based on the number of extended fingers
+    if count == 0:
+        return "Fist"
+    elif count == 5:
+        return "Open Hand"
+    elif count == 1 and index_extended:
+        return "Pointing"
+    elif count == 2 and index_extended and middle_extended:
+        return "Peace Sign"
+    elif count == 3:
+        return "Three Fingers"
+    elif count == 4:
+        return "Four Fingers"
+    else:
+        return "Custom Gesture"
+
+
+def prepare_frame(frame):
+    """Mirror a BGR frame and convert it to RGB for MediaPipe with a single full-frame copy."""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    cv2.flip(rgb_frame, 1, dst=rgb_frame)
+    return rgb_frame
+
+
+def check_render_mode(render):
+    if render not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {render!r}, expected one of {RENDER_MODES}")
+
+
+def process_image_with_frame(frame, user_name, render=RENDER_NONE, detector=None):
+    """
+    Hash the gesture in a BGR camera frame for user_name.
+    The login and signup paths use the default RENDER_NONE, which skips all
+    drawing; other modes also return the annotated mirrored frame.
+    detector defaults to the shared detector (see get_hand_detector); any
+    detectors.HandDetector works.
+    """
+    check_render_mode(render)
+
+    # Process the image with the shared, already initialised detector
+    if detector is None:
+        detector = get_hand_detector()
+    detection = detector.detect(frame)
+    gesture = "No Hand Detected"
+    gesture_hash = None
+    features = None
+    template = None
+
+    # Check if hand landmarks are detected
+    for landmarks in detection.landmarks:
+        gesture = classify_gesture(landmarks)
+
+        # Generate hash for the current gesture, keeping the finer template
+        # so the caller can do a tolerant match against the enrolled one
+        features, template = get_gesture_features_and_template(landmarks)
+        gesture_hash = hash_gesture_features(features, salt=user_name)
+
+    annotated_frame = None
+    if render != RENDER_NONE:
+        # Drawing uses MediaPipe's skeleton, so only load it when asked to draw
+        from .hand_tracker import render_frame
+
+        # Show hash for reference
+        short_hash = gesture_hash if gesture_hash else "None"
+        annotated_frame = render_frame(
+            frame, detection.hand_landmarks, render, [(f"Hash: {short_hash}", 100)]
+        )
+
+    return {
+        "gesture": gesture,
+        "gesture_hash": gesture_hash,
+        "features": features,
+        "template": template,
+        "annotated_frame": annotated_frame,
+        "timings": detection.timings,
+    }
+
+
@@ -1,54 +1,277 @@
+import argparse
+import os
+import queue
+import threading
+import time
+
 import cv2
 import mediapipe as mp
 
+from camera.frame_source import open_frame_source
+from .live_pipeline import LatencyTracker
+
 # Initialize MediaPipe Gesture Recognizer
 BaseOptions = mp.tasks.BaseOptions
 GestureRecognizer = mp.tasks.vision.GestureRecognizer
 GestureRecognizerOptions = mp.tasks.vision.GestureRecognizerOptions
 VisionRunningMode = mp.tasks.vision.RunningMode
 
-# Callback function for processing results
-def print_recognition_result(result, unused_output_image, timestamp_ms):
-    if result.gestures:
-        detected_gesture = result.gestures[0][0].category_name  # Get top gesture
-        print(f"Detected Gesture: {detected_gesture}")
-
-# Load Gesture Recognizer model
-options = GestureRecognizerOptions(
-    base_options=BaseOptions(model_asset_path="gesture_recognizer.task"),
-    running_mode=VisionRunningMode.LIVE_STREAM,
-    result_callback=print_recognition_result,
-)
-
-# Start Webcam
-cap = cv2.VideoCapture(0)
-timestamp = 0
-
-with GestureRecognizer.create_from_options(options) as recognizer:
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            print("Ignoring empty frame.")
-            continue
+# Model file; point $GESTURE_RECOGNIZER_MODEL (or model_path) at a local copy to run offline
+DEFAULT_MODEL_PATH = "gesture_recognizer.task"
+MODEL_PATH_ENV = "GESTURE_RECOGNIZER_MODEL"
+
+# Frames handed to the recognizer that haven't produced a result yet. New
+# frames are dropped while this many are pending, so a slow recognizer
+# doesn't build up a backlog.
+MAX_IN_FLIGHT = 2
+
+# LIVE_STREAM may drop frames without calling back; a pending frame older
+# than this is given up on, so dropped frames can't block submit() for good
+IN_FLIGHT_TIMEOUT = 1.0
+
+# Results waiting for the consumer; the oldest is dropped when full
+RESULT_QUEUE_SIZE = 8
+
+
+class RecognitionResult:
+    """
+    Top gesture for one frame, with its monotonic timestamp and recognition
+    latency (None if the frame's submit time was no longer known).
+    """
+
+    __slots__ = ("timestamp_ms", "gesture", "score", "latency_ms", "result")
+
+    def __init__(self, timestamp_ms, gesture, score, latency_ms, result):
+        self.timestamp_ms = timestamp_ms
+        self.gesture = gesture
+        self.score = score
+        self.latency_ms = latency_ms
+        self.result = result  # the raw GestureRecognizerResult
+
+    def __repr__(self):
+        latency = f"{self.latency_ms:.1f}" if self.latency_ms is not None else "unknown"
+        return f"RecognitionResult({self.gesture!r}, score={self.score}, latency_ms={latency})"
+
+
+class AsyncGestureRecognizer:
+    """
+    MediaPipe Gesture Recognizer in LIVE_STREAM mode.
+
+    submit() stamps frames with monotonic timestamps and drops them while
+    max_in_flight frames are still being recognized. Results arrive on
+    MediaPipe's callback thread and are handed to the consumer through a
+    thread-safe queue (get_result / latest_result).
+    """
+
+    def __init__(self, model_path=None, max_in_flight=MAX_IN_FLIGHT, num_hands=1,
+                 result_queue_size=RESULT_QUEUE_SIZE):
+        self.model_path = model_path or os.environ.get(MODEL_PATH_ENV) or DEFAULT_MODEL_PATH
+        self.max_in_flight = max_in_flight
+        self.num_hands = num_hands
+        self.results = queue.Queue(maxsize=result_queue_size)
+
+        self._recognizer = None
+        self._lock = threading.Lock()
+        self._in_flight = {}  # timestamp_ms -> submit time (perf_counter)
+        self._last_timestamp_ms = -1
+        self._clock_start = time.monotonic()
+
+        self.latency = LatencyTracker()
+        self.submitted = 0
+        self.completed = 0
+        self.dropped_frames = 0
+        self.dropped_results = 0
+        self.expired = 0
+
+    def start(self):
+        if self._recognizer is not None:
+            return self
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(
+                f"Gesture recognizer model not found at {self.model_path}; "
+                f"download gesture_recognizer.task or set ${MODEL_PATH_ENV}"
+            )
+        options = GestureRecognizerOptions(
+            base_options=BaseOptions(model_asset_path=self.model_path),
+            running_mode=VisionRunningMode.LIVE_STREAM,
+            num_hands=self.num_hands,
+            result_callback=self._on_result,
+        )
+        self._recognizer = GestureRecognizer.create_from_options(options)
+        return self
+
+    def _next_timestamp_ms(self):
+        # LIVE_STREAM needs strictly increasing timestamps
+        timestamp_ms = int((time.monotonic() - self._clock_start) * 1000)
+        timestamp_ms = max(timestamp_ms, self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def submit(self, frame):
+        """
+        Queue a BGR frame for recognition. Returns its timestamp in ms, or None
+        if it was dropped because the recognizer is behind.
+        """
+        if self._recognizer is None:
+            self.start()
+
+        with self._lock:
+            self._expire_in_flight()
+            if len(self._in_flight) >= self.max_in_flight:
+                self.dropped_frames += 1
+                return None
+            timestamp_ms = self._next_timestamp_ms()
+            self._in_flight[timestamp_ms] = time.perf_counter()
+            self.submitted += 1
 
         # Convert frame to RGB (MediaPipe expects RGB format)
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        try:
+            self._recognizer.recognize_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame), timestamp_ms)
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(timestamp_ms, None)
+            raise
+        return timestamp_ms
+
+    def _expire_in_flight(self):
+        # Called with the lock held
+        deadline = time.perf_counter() - IN_FLIGHT_TIMEOUT
+        for timestamp_ms in [ts for ts, submitted_at in self._in_flight.items() if submitted_at < deadline]:
+            del self._in_flight[timestamp_ms]
+            self.expired += 1
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        # Runs on MediaPipe's thread: record latency and hand the result over
+        with self._lock:
+            submitted_at = self._in_flight.pop(timestamp_ms, None)
+            # Results arrive in timestamp order, so earlier frames still
+            # pending were dropped by MediaPipe and will never call back
+            for earlier in [ts for ts in self._in_flight if ts < timestamp_ms]:
+                del self._in_flight[earlier]
+            self.completed += 1
+        # A frame that expired or was cleared has no submit time; leave it out
+        # of the latency stats rather than count it as instant
+        latency_ms = None
+        if submitted_at is not None:
+            latency_ms = (time.perf_counter() - submitted_at) * 1000
+            self.latency.add(latency_ms)
+
+        gesture = None
+        score = 0.0
+        if result.gestures:
+            top = result.gestures[0][0]  # Get top gesture
+            gesture = top.category_name
+            score = top.score
+
+        item = RecognitionResult(timestamp_ms, gesture, score, latency_ms, result)
+        while True:
+            try:
+                self.results.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.results.get_nowait()
+                    self.dropped_results += 1
+                except queue.Empty:
+                    pass
+
+    def get_result(self, timeout=None):
+        """Next result in timestamp order, or None if none arrives within timeout."""
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def latest_result(self):
+        """Drain the queue and return the newest result, or None if there was none."""
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                return latest
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self):
+        stats = self.latency.stats()
+        stats.update({
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "dropped_frames": self.dropped_frames,
+            "dropped_results": self.dropped_results,
+            "expired": self.expired,
+            "in_flight": self.in_flight,
+        })
+        return stats
+
+    def close(self):
+        if self._recognizer is not None:
+            self._recognizer.close()
+            self._recognizer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(source=None, model_path=None):
+    # Start Webcam (or the source selected by a spec or $FRAME_SOURCE)
+    cap = open_frame_source(source)
+    detected_gesture = None
+
+    with AsyncGestureRecognizer(model_path) as recognizer:
+        while cap.isOpened():
+            success, frame = cap.read()
+            if not success:
+                print("Ignoring empty frame.")
+                continue
+
+            recognizer.submit(frame)
+
+            # Show the newest finished result; older ones are superseded
+            result = recognizer.latest_result()
+            if result is not None:
+                if result.gesture != detected_gesture and result.gesture:
+                    latency = f"{result.latency_ms:.0f} ms" if result.latency_ms is not None else "latency unknown"
+                    print(f"Detected Gesture: {result.gesture} ({latency})")
+                detected_gesture = result.gesture
+
+            if detected_gesture:
+                cv2.putText(frame, f"Gesture: {detected_gesture}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.8, (0, 255, 0), 2, cv2.LINE_AA)
+
+            # Display camera feed
+            cv2.imshow("Gesture Recognition", frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            # Capture a recognized gesture when 'c' is pressed
+            if key == ord("c"):
+                print(f"Captured Gesture! {detected_gesture}")
+            # Exit on 'q' key
+            elif key == ord("q"):
+                break
 
-        # Process frame
-        timestamp += 33  # Get timestamp
-        recognizer.recognize_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame), timestamp)
+        stats = recognizer.stats()
 
-        # Display camera feed
-        cv2.imshow("Gesture Recognition", frame)
+    # Cleanup
+    cap.release()
+    cv2.destroyAllWindows()
 
-        # Capture a recognized gesture when 'c' is pressed
-        if cv2.waitKey(1) & 0xFF == ord("c"):
-            print("Captured Gesture!")
+    print(f"Recognized {stats['completed']}/{stats['submitted']} frames, dropped {stats['dropped_frames']} "
+          f"while busy; latency p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms")
 
-        # Exit on 'q' key
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
 
-# Cleanup
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live MediaPipe gesture recognition.")
+    parser.add_argument("source", nargs="?", help="frame source spec (default: camera or $FRAME_SOURCE)")
+    parser.add_argument("--model", help=f"gesture_recognizer.task path (default: ${MODEL_PATH_ENV} "
+                        f"or {DEFAULT_MODEL_PATH})")
+    args = parser.parse_args()
+    main(args.source, args.model)
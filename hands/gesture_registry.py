@@ -0,0 +1,198 @@
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from .gesture_index import GestureIndex, MATCH_TOLERANCE
+
+# Entries from saved_gestures.json files written before namespacing were
+# all hashed with the hand trackers' default "user1" salt.
+LEGACY_NAMESPACE = "user1"
+
+# Seconds to collect registrations before writing them out together
+FLUSH_INTERVAL = 1.0
+
+
+class GestureRegistry:
+    """
+    Registered gestures from saved_gestures.json, cached in memory.
+
+    The file is only re-read when its mtime or size changes. Entries are
+    namespaced per user/salt, each namespace keeps a GestureIndex for matching,
+    and writes are batched and written atomically (temp file + rename).
+    """
+
+    def __init__(self, filename="saved_gestures.json", flush_interval=FLUSH_INTERVAL,
+                 tolerance=MATCH_TOLERANCE):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self.tolerance = tolerance
+
+        self._lock = threading.RLock()
+        self._namespaces = {}  # namespace -> {name: {"hash": ..., "template": [...]}}
+        self._indexes = {}  # namespace -> GestureIndex, rebuilt lazily after changes
+        self._pending = {}  # (namespace, name) -> entry, or None for a removal
+        self._flush_timer = None
+        self._file_stat = None
+
+        self.refresh()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self, force=False):
+        """Reload the file if it changed on disk. Returns True if it was re-read."""
+        with self._lock:
+            file_stat = self._stat()
+            if not force and file_stat == self._file_stat:
+                return False
+
+            namespaces = self._read_file()
+            # Changes not flushed yet still win over what is on disk
+            for (namespace, name), entry in self._pending.items():
+                self._apply(namespaces, namespace, name, entry)
+
+            self._namespaces = namespaces
+            self._indexes = {}
+            self._file_stat = file_stat
+            return True
+
+    def _read_file(self):
+        if not os.path.exists(self.filename):
+            return {}
+        with open(self.filename, "r") as f:
+            data = json.load(f)
+
+        if "namespaces" in data:
+            return data["namespaces"]
+
+        # Legacy flat file: name -> hash or name -> {"hash", "features"}. Those
+        # features are too coarse for near matches, so only the hash is kept.
+        legacy = {}
+        for name, entry in data.items():
+            legacy[name] = {"hash": entry["hash"] if isinstance(entry, dict) else entry, "template": None}
+        return {LEGACY_NAMESPACE: legacy} if legacy else {}
+
+    @staticmethod
+    def _apply(namespaces, namespace, name, entry):
+        if entry is None:
+            namespaces.get(namespace, {}).pop(name, None)
+        else:
+            namespaces.setdefault(namespace, {})[name] = entry
+
+    def register(self, name, gesture_hash, template=None, namespace=LEGACY_NAMESPACE):
+        entry = {"hash": gesture_hash, "template": list(template) if template is not None else None}
+        self._change(namespace, name, entry)
+
+    def remove(self, name, namespace=LEGACY_NAMESPACE):
+        self._change(namespace, name, None)
+
+    def _change(self, namespace, name, entry):
+        with self._lock:
+            self._apply(self._namespaces, namespace, name, entry)
+            self._pending[(namespace, name)] = entry
+            self._indexes.pop(namespace, None)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self.flush_interval <= 0:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+
+            # Pick up changes made by other processes before overwriting the file
+            self.refresh()
+
+            directory = os.path.dirname(os.path.abspath(self.filename))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".gestures_", suffix=".tmp")
+            try:
+                if os.path.exists(self.filename):
+                    shutil.copymode(self.filename, temp_path)
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"version": 2, "namespaces": self._namespaces}, f)
+                os.replace(temp_path, self.filename)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+            self._pending = {}
+            self._file_stat = self._stat()
+            print(f"Gestures saved to {self.filename}")
+
+    def close(self):
+        self.flush()
+
+    def _index(self, namespace):
+        index = self._indexes.get(namespace)
+        if index is None:
+            index = GestureIndex.from_registered(self._namespaces.get(namespace, {}), self.tolerance)
+            self._indexes[namespace] = index
+        return index
+
+    def match(self, gesture_hash, template=None, namespace=LEGACY_NAMESPACE):
+        """Name of the registered gesture matching the template (or hash), or None."""
+        with self._lock:
+            self.refresh()
+            return self._index(namespace).match(gesture_hash, template)
+
+    def names_for_hash(self, gesture_hash, namespace=LEGACY_NAMESPACE):
+        with self._lock:
+            self.refresh()
+            return self._index(namespace).names_for_hash(gesture_hash)
+
+    def get(self, name, namespace=LEGACY_NAMESPACE):
+        with self._lock:
+            self.refresh()
+            return self._namespaces.get(namespace, {}).get(name)
+
+    def items(self, namespace=LEGACY_NAMESPACE):
+        with self._lock:
+            self.refresh()
+            return list(self._namespaces.get(namespace, {}).items())
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._namespaces.values())
+
+
+# Shared registries, one per file
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_gesture_registry(filename="saved_gestures.json"):
+    """Get the shared registry for a gestures file, loading it on first use."""
+    with _registries_lock:
+        registry = _registries.get(filename)
+        if registry is None:
+            registry = GestureRegistry(filename)
+            _registries[filename] = registry
+    return registry
+
+
+def flush_gesture_registries():
+    """Write out pending registrations, e.g. when the application is closing."""
+    with _registries_lock:
+        registries = list(_registries.values())
+    for registry in registries:
+        registry.flush()
+
+
+atexit.register(flush_gesture_registries)
@@ -1,281 +1,273 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import json
-import os
+import threading
+import time
 from .gesture_conversions import (
-    get_gesture_hash,
+    get_gesture_features_and_template,
+    hash_gesture_features,
 )
+from .detectors import HandDetection
+from .gesture_pipeline import (  # re-exported for existing callers
+    RENDER_HUD,
+    RENDER_LANDMARKS,
+    RENDER_MODES,
+    RENDER_NONE,
+    check_render_mode,
+    classify_gesture,
+    get_hand_detector,
+    prepare_frame,
+    process_image_with_frame,
+    release_hand_detector,
+    warm_up_hand_detector,
+)
+from .gesture_registry import get_gesture_registry
+from .landmark_frame import LandmarkFrame
 
 # Initialize MediaPipe Hands and Drawing modules
 mp_hands = mp.solutions.hands
 mp_draw = mp.solutions.drawing_utils
 
 
-def classify_gesture(landmarks):
+class HandDetectorService:
     """
-    Classify the gesture based on the relative positions of hand landmarks.
-    Uses a simple heuristic:
-      - Thumb: considered extended if tip is to the left of the IP joint (for right hand).
-      - Other fingers: considered extended if tip is above (smaller y) than the PIP joint.
+    Long-lived static-image MediaPipe Hands detector shared by the login and
+    signup paths, so the graph and model are only initialised once.
+    Calls are serialised with a lock because a Hands graph is not thread-safe.
+    This is the MediaPipe implementation of detectors.HandDetector.
     """
-    # Thumb: landmarks[4] is the tip, landmarks[3] is the IP joint.
-    thumb_extended = landmarks[4].x < landmarks[3].x
-
-    # For fingers: if the tip is above the PIP joint, consider the finger extended.
-    # Index finger: tip is landmarks[8], PIP is landmarks[6]
-    index_extended = landmarks[8].y < landmarks[6].y
-    # Middle finger: tip is landmarks[12], PIP is landmarks[10]
-    middle_extended = landmarks[12].y < landmarks[10].y
-    # Ring finger: tip is landmarks[16], PIP is landmarks[14]
-    ring_extended = landmarks[16].y < landmarks[14].y
-    # Pinky: tip is landmarks[20], PIP is landmarks[18]
-    pinky_extended = landmarks[20].y < landmarks[18].y
-
-    fingers = [
-        thumb_extended,
-        index_extended,
-        middle_extended,
-        ring_extended,
-        pinky_extended,
-    ]
-    count = sum(fingers)
-
-    # Classify gesture based on the number of extended fingers
-    if count == 0:
-        return "Fist"
-    elif count == 5:
-        return "Open Hand"
-    elif count == 1 and index_extended:
-        return "Pointing"
-    elif count == 2 and index_extended and middle_extended:
-        return "Peace Sign"
-    elif count == 3:
-        return "Three Fingers"
-    elif count == 4:
-        return "Four Fingers"
-    else:
-        return "Custom Gesture"
 
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7):
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self._hands = None
+        self._lock = threading.Lock()
+
+        # Timings in milliseconds, for comparing cold and warm latency
+        self.init_ms = None
+        self.first_process_ms = None
+        self.last_process_ms = None
+        self.total_process_ms = 0.0
+        self.process_count = 0
+
+    def start(self):
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._hands is not None:
+            return
+        start = time.perf_counter()
+        self._hands = mp_hands.Hands(
+            static_image_mode=True,  # Set to True for image processing
+            max_num_hands=self.max_num_hands,
+            min_detection_confidence=self.min_detection_confidence,
+        )
+        self.init_ms = (time.perf_counter() - start) * 1000
+
+    def warm_up(self, width=640, height=480):
+        """Initialise the graph and run one blank frame through it."""
+        self.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def process(self, rgb_frame):
+        with self._lock:
+            self._start_locked()
+            start = time.perf_counter()
+            results = self._hands.process(rgb_frame)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            if self.first_process_ms is None:
+                self.first_process_ms = elapsed_ms
+            self.last_process_ms = elapsed_ms
+            self.total_process_ms += elapsed_ms
+            self.process_count += 1
+        return results
+
+    def detect(self, frame):
+        """Mirror a BGR frame, find hands in it and return a HandDetection."""
+        rgb_frame = prepare_frame(frame)
+        start = time.perf_counter()
+        results = self.process(rgb_frame)
+        detect_ms = (time.perf_counter() - start) * 1000
+
+        hand_landmarks_list = results.multi_hand_landmarks or []
+        handedness_list = results.multi_handedness or []
+        landmarks = [
+            LandmarkFrame.from_mediapipe(hand_landmarks, handedness)
+            for hand_landmarks, handedness in zip(hand_landmarks_list, handedness_list)
+        ]
+        return HandDetection(
+            landmarks,
+            [frame.handedness for frame in landmarks],
+            hand_landmarks_list,
+            {"detect_ms": detect_ms},
+        )
 
-# Function to save and load gestures from a file
-def save_gestures(gestures, filename="saved_gestures.json"):
-    with open(filename, "w") as f:
-        json.dump(gestures, f)
-    print(f"Gestures saved to {filename}")
+    def close(self):
+        with self._lock:
+            if self._hands is not None:
+                self._hands.close()
+                self._hands = None
+
+    def timings(self):
+        """Cold (init + first frame) and warm (average per frame) latency in ms."""
+        warm_count = self.process_count - 1
+        return {
+            "init_ms": self.init_ms,
+            "first_process_ms": self.first_process_ms,
+            "last_process_ms": self.last_process_ms,
+            "warm_mean_ms": (self.total_process_ms - self.first_process_ms) / warm_count if warm_count > 0 else None,
+            "process_count": self.process_count,
+        }
 
 
-def load_gestures(filename="saved_gestures.json"):
-    if os.path.exists(filename):
-        with open(filename, "r") as f:
-            return json.load(f)
-    return {}
+def render_frame(frame, hand_landmarks_list, render, hud_lines=()):
+    """
+    Build the annotated output for a render mode: a mirrored copy of frame with
+    the hand skeleton, plus the (text, y) HUD lines for RENDER_HUD.
+    Returns None for RENDER_NONE without touching the frame.
+    """
+    if render == RENDER_NONE:
+        return None
 
+    # Mirror the image for more intuitive display
+    annotated = cv2.flip(frame, 1)
+    for hand_landmarks in hand_landmarks_list:
+        mp_draw.draw_landmarks(annotated, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-def process_image_with_frame(frame, user_name):
-    # Load gestures
-    registered_gestures = load_gestures()
-    print(f"Loaded {len(registered_gestures)} gestures")
+    if render == RENDER_HUD:
+        for text, y in hud_lines:
+            cv2.putText(
+                annotated,
+                text,
+                (10, y),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.8,
+                (0, 255, 0),
+                2,
+                cv2.LINE_AA,
+            )
+    return annotated
 
-    # Initialize the hand detector
-    with mp_hands.Hands(
-        static_image_mode=True,  # Set to True for image processing
-        max_num_hands=1,
-        min_detection_confidence=0.7,
-    ) as hands:
-        # Mirror the image for more intuitive display
-        frame = cv2.flip(frame, 1)
 
-        # Convert to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+def process_image(image_path=None, render=RENDER_HUD, interactive=True):
+    """
+    Analyse one image from image_path, or from the camera if no path is given.
+    With interactive=True the annotated result is shown and S saves the gesture;
+    otherwise the result dict (including "annotated_frame") is returned directly.
+    """
+    check_render_mode(render)
 
-        # Process the image
-        results = hands.process(rgb_frame)
-        gesture_hash = None
+    # Load gestures (cached, only re-read when the file changes)
+    registry = get_gesture_registry()
+    print(f"Loaded {len(registry)} gestures")
 
-        # Check if hand landmarks are detected
-        if results.multi_hand_landmarks:
-          for hand_landmarks in results.multi_hand_landmarks:
-              # Draw hand landmarks on the frame
-              mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+    # Use the shared hand detector instead of initialising a new one per image
+    hands = get_hand_detector()
 
-              landmarks = hand_landmarks.landmark
+    # Capture image from camera if no path provided
+    if image_path is None:
+        cap = cv2.VideoCapture(0)
+        print("Press SPACE to capture an image...")
 
-              # Generate hash for the current gesture
-              gesture_hash = get_gesture_hash(landmarks, salt=user_name)
-                    
-   # Show hash for reference
-    short_hash = gesture_hash if gesture_hash else "None"
-    cv2.putText(
-        frame,
-        f"Hash: {short_hash}",
-        (10, 100),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        0.8,
-        (0, 255, 0),
-        2,
-        cv2.LINE_AA,
-    )
-    
-    return {
-        "gesture_hash": gesture_hash,
-    }
+        while True:
+            success, frame = cap.read()
+            if not success:
+                print("Failed to capture image from camera.")
+                return
 
+            # Display preview
+            cv2.imshow("Press SPACE to capture", frame)
+            key = cv2.waitKey(1) & 0xFF
 
-def process_image(image_path=None):
-    # Load gestures
-    registered_gestures = load_gestures()
-    print(f"Loaded {len(registered_gestures)} gestures")
-
-    # Initialize the hand detector
-    with mp_hands.Hands(
-        static_image_mode=True,  # Set to True for image processing
-        max_num_hands=1,
-        min_detection_confidence=0.7,
-    ) as hands:
-
-        # Capture image from camera if no path provided
-        if image_path is None:
-            cap = cv2.VideoCapture(0)
-            print("Press SPACE to capture an image...")
-
-            while True:
-                success, frame = cap.read()
-                if not success:
-                    print("Failed to capture image from camera.")
-                    return
-
-                # Display preview
-                cv2.imshow("Press SPACE to capture", frame)
-                key = cv2.waitKey(1) & 0xFF
-
-                if key == 32:  # SPACE key
-                    print("Image captured!")
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    break
-                elif key == ord("q"):
-                    print("Cancelled.")
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    return
-        else:
-            # Load image from file
-            frame = cv2.imread(image_path)
-            if frame is None:
-                print(f"Failed to load image from {image_path}")
+            if key == 32:  # SPACE key
+                print("Image captured!")
+                cap.release()
+                cv2.destroyAllWindows()
+                break
+            elif key == ord("q"):
+                print("Cancelled.")
+                cap.release()
+                cv2.destroyAllWindows()
                 return
+    else:
+        # Load image from file
+        frame = cv2.imread(image_path)
+        if frame is None:
+            print(f"Failed to load image from {image_path}")
+            return
 
-        # Mirror the image for more intuitive display
-        frame = cv2.flip(frame, 1)
-
-        # Convert to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Process the image
-        results = hands.process(rgb_frame)
-
-        gesture = "No Hand Detected"
-        gesture_hash = None
-        matched_gesture = None
-
-        # Check if hand landmarks are detected
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks on the frame
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-                # Get landmarks
-                landmarks = hand_landmarks.landmark
-
-                # Classify the gesture
-                gesture = classify_gesture(landmarks)
-
-                # Generate hash for the current gesture
-                gesture_hash = get_gesture_hash(landmarks, salt="user1")
-
-                # Check if the hash matches any registered gestures
-                for name, registered_hash in registered_gestures.items():
-                    if gesture_hash == registered_hash:
-                        matched_gesture = name
-                        break
-
-        # Display results on the image
-        cv2.putText(
-            frame,
-            f"Gesture: {gesture}",
-            (10, 40),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.8,
-            (0, 255, 0),
-            2,
-            cv2.LINE_AA,
-        )
+    # Process the image
+    detection = hands.detect(frame)
 
-        if matched_gesture:
-            cv2.putText(
-                frame,
-                f"Matched: {matched_gesture}",
-                (10, 70),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 255, 0),
-                2,
-                cv2.LINE_AA,
-            )
+    gesture = "No Hand Detected"
+    gesture_hash = None
+    template = None
+    matched_gesture = None
 
-        # Show hash for reference
-        short_hash = gesture_hash if gesture_hash else "None"
-        cv2.putText(
-            frame,
-            f"Hash: {short_hash}",
-            (10, 100),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.8,
-            (0, 255, 0),
-            2,
-            cv2.LINE_AA,
-        )
+    # Check if hand landmarks are detected
+    for landmarks in detection.landmarks:
+        # Classify the gesture
+        gesture = classify_gesture(landmarks)
 
-        # Display instructions
-        cv2.putText(
-            frame,
-            "S: Save as registered gesture | Q: Quit",
-            (10, frame.shape[0] - 40),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (255, 255, 255),
-            1,
-            cv2.LINE_AA,
-        )
+        # Generate hash for the current gesture
+        features, template = get_gesture_features_and_template(landmarks)
+        gesture_hash = hash_gesture_features(features, salt="user1")
 
-        # Show the result
-        cv2.imshow("Hand Gesture Analysis", frame)
+        # Check if the template (or hash) matches any registered gestures
+        matched_gesture = registry.match(gesture_hash, template)
 
-        # Wait for user input
-        while True:
-            key = cv2.waitKey(0) & 0xFF
-
-            if key == ord("s") and gesture_hash:
-                # Save the current gesture
-                gesture_name = input("Enter a name for this gesture: ")
-                if gesture_name:
-                    registered_gestures[gesture_name] = gesture_hash
-                    save_gestures(registered_gestures)
-                    print(
-                        f"Gesture '{gesture_name}' registered with hash: {gesture_hash}"
-                    )
+    # Display results on the image
+    short_hash = gesture_hash if gesture_hash else "None"
+    hud_lines = [(f"Gesture: {gesture}", 40)]
+    if matched_gesture:
+        hud_lines.append((f"Matched: {matched_gesture}", 70))
+    hud_lines.append((f"Hash: {short_hash}", 100))
+    annotated_frame = render_frame(frame, detection.hand_landmarks, render, hud_lines)
+
+    result = {
+        "gesture": gesture,
+        "matched_gesture": matched_gesture,
+        "gesture_hash": gesture_hash,
+        "annotated_frame": annotated_frame,
+    }
+    if not interactive or annotated_frame is None:
+        return result
 
-            elif key == ord("q"):
-                break
+    # Display instructions
+    cv2.putText(
+        annotated_frame,
+        "S: Save as registered gesture | Q: Quit",
+        (10, annotated_frame.shape[0] - 40),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.6,
+        (255, 255, 255),
+        1,
+        cv2.LINE_AA,
+    )
 
-        cv2.destroyAllWindows()
+    # Show the result
+    cv2.imshow("Hand Gesture Analysis", annotated_frame)
 
-        return {
-            "gesture": gesture,
-            "matched_gesture": matched_gesture,
-            "gesture_hash": gesture_hash,
-        }
+    # Wait for user input
+    while True:
+        key = cv2.waitKey(0) & 0xFF
+
+        if key == ord("s") and gesture_hash:
+            # Save the current gesture
+            gesture_name = input("Enter a name for this gesture: ")
+            if gesture_name:
+                registry.register(gesture_name, gesture_hash, template)
+                print(
+                    f"Gesture '{gesture_name}' registered with hash: {gesture_hash}"
+                )
+
+        elif key == ord("q"):
+            break
+
+    cv2.destroyAllWindows()
+
+    return result
 
 
 def main():
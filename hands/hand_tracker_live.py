@@ -1,204 +1,289 @@
+import argparse
+import threading
+import time
+from collections import Counter
+
 import cv2
-import mediapipe as mp
-import numpy as np
-import json
-import os
-from gesture_conversions import get_gesture_hash
 
-# Initialize MediaPipe Hands and Drawing modules
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
+from camera.frame_source import open_frame_source
+from .gesture_memo import GestureMemo
+from .gesture_registry import get_gesture_registry
+from .hand_tracker import mp_hands, mp_draw
+from .inference_scheduler import InferenceScheduler
+from .landmark_frame import LandmarkFrame
+from .live_pipeline import LatencyTracker, LatestQueue
+from .roi_tracker import RoiTracker
+
+
+# Seconds a stage waits on its input queue before checking for shutdown
+STAGE_TIMEOUT = 0.1
+
+
+def capture_stage(cap, frames, stop):
+    """Capture thread: read and mirror frames, stamped with their capture time."""
+    try:
+        while not stop.is_set() and cap.isOpened():
+            success, frame = cap.read()
+            frame_time = time.monotonic()
+            if not success:
+                print("Ignoring empty frame.")
+                continue
+
+            frame = cv2.flip(frame, 1)  # Mirror image for user-friendliness
+            frames.put((frame, frame_time))
+    finally:
+        frames.close()
+
 
-def classify_gesture(landmarks):
+def inference_stage(frames, decisions, stop, roi_tracker, scheduler, memos, registry, user, decision_latency):
     """
-    Classify the gesture based on the relative positions of hand landmarks.
-    Uses a simple heuristic:
-      - Thumb: considered extended if tip is to the left of the IP joint (for right hand).
-      - Other fingers: considered extended if tip is above (smaller y) than the PIP joint.
+    Inference thread: detect, hash and match the latest captured frame.
+    Every frame is passed on for display; frames the scheduler skips carry
+    the detections of the last inferred frame.
     """
-    # Thumb: landmarks[4] is the tip, landmarks[3] is the IP joint.
-    thumb_extended = landmarks[4].x < landmarks[3].x
-
-    # For fingers: if the tip is above the PIP joint, consider the finger extended.
-    # Index finger: tip is landmarks[8], PIP is landmarks[6]
-    index_extended = landmarks[8].y < landmarks[6].y
-    # Middle finger: tip is landmarks[12], PIP is landmarks[10]
-    middle_extended = landmarks[12].y < landmarks[10].y
-    # Ring finger: tip is landmarks[16], PIP is landmarks[14]
-    ring_extended = landmarks[16].y < landmarks[14].y
-    # Pinky: tip is landmarks[20], PIP is landmarks[18]
-    pinky_extended = landmarks[20].y < landmarks[18].y
-
-    fingers = [thumb_extended, index_extended, middle_extended, ring_extended, pinky_extended]
-    count = sum(fingers)
-
-    # Classify gesture based on the number of extended fingers
-    if count == 0:
-        return "Fist"
-    elif count == 5:
-        return "Open Hand"
-    elif count == 1 and index_extended:
-        return "Pointing"
-    elif count == 2 and index_extended and middle_extended:
-        return "Peace Sign"
-    elif count == 3:
-        return "Three Fingers"
-    elif count == 4:
-        return "Four Fingers"
-    else:
-        return "Custom Gesture"
-
-# Function to save and load gestures from a file
-def save_gestures(gestures, filename="saved_gestures.json"):
-    with open(filename, 'w') as f:
-        json.dump(gestures, f)
-    print(f"Gestures saved to {filename}")
-
-def load_gestures(filename="saved_gestures.json"):
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            return json.load(f)
-    return {}
-
-def main():
-    cap = cv2.VideoCapture(0)
+    detections = []  # (hand_landmarks, gesture, hash, template, match) from the last inferred frame
+    roi = None
+    try:
+        # Tracking mode unless the crop follows the hand every frame (--static-roi)
+        with mp_hands.Hands(max_num_hands=1, 
+                           min_detection_confidence=0.7, 
+                           min_tracking_confidence=0.7,
+                           **roi_tracker.hands_options()) as hands:
+            while not stop.is_set():
+                item = frames.get(timeout=STAGE_TIMEOUT)
+                if item is None:
+                    if frames.closed:
+                        break
+                    continue
+                frame, frame_time = item
+
+                if scheduler is None or scheduler.should_infer(frame):
+                    roi = roi_tracker.roi
+                    results = roi_tracker.process(hands, frame)
+                    if scheduler is not None:
+                        scheduler.record_latency(roi_tracker.last_inference_ms)
+
+                    detections = []
+                    hands_found = zip(results.multi_hand_landmarks or [], results.multi_handedness or [])
+                    for hand_index, (hand_landmarks, handedness) in enumerate(hands_found):
+                        # Copy the landmarks into an array-backed frame once per detection
+                        landmarks = LandmarkFrame.from_mediapipe(hand_landmarks, handedness, frame_time)
+                        
+                        # Classify and hash the gesture, reusing the last result while the hand holds still
+                        if hand_index == len(memos):
+                            memos.append(GestureMemo(salt=user))
+                        memo_result = memos[hand_index].lookup(landmarks)
+                        gesture = memo_result["gesture"]
+                        template = memo_result["template"]
+                        gesture_hash = memo_result["gesture_hash"]
+                        
+                        # Check the template within tolerance (or the hash) against registered gestures
+                        matched_gesture = registry.match(gesture_hash, template, namespace=user)
+                        detections.append((hand_landmarks, gesture, gesture_hash, template, matched_gesture))
+
+                    # Glass-to-decision: from capture until the gesture is matched
+                    decision_latency.add((time.monotonic() - frame_time) * 1000)
+
+                decisions.put((frame, frame_time, detections, roi))
+    finally:
+        stop.set()
+        decisions.close()
+
+
+def main(source=None, use_roi=True, use_scheduler=True, static_roi=False):
+    # Live camera unless a source spec or $FRAME_SOURCE selects a video, image directory or synthetic feed
+    cap = open_frame_source(source)
     
-    # Dictionary to store registered gesture hashes
-    registered_gestures = load_gestures()
+    # Registered gestures, namespaced by user and indexed by hash
+    registry = get_gesture_registry()
     current_mode = "recognition"  # Modes: "recognition", "registration"
     current_user = "user1"  # Default user
     
     # Dynamic calibration data
-    last_gestures = []  # Store the last few gesture hashes for the same gesture
+    last_gestures = []  # Store the last few (hash, template) samples for the same gesture
     calibration_gesture = None  # Current gesture being calibrated
     
-    print(f"Loaded {len(registered_gestures)} gestures")
+    print(f"Loaded {len(registry)} gestures")
     
-    # Optionally flip the frame to act like a mirror.
-    with mp_hands.Hands(max_num_hands=1, 
-                       min_detection_confidence=0.7, 
-                       min_tracking_confidence=0.7) as hands:
-        while cap.isOpened():
-            success, frame = cap.read()
-            if not success:
-                print("Ignoring empty frame.")
-                continue
+    # Crops inference to the hand found in the previous frame, full frame when lost
+    roi_tracker = RoiTracker(enabled=use_roi, tracking=not static_roi)
+    
+    # Skips inference on static frames and backs off when inference is over budget
+    scheduler = InferenceScheduler(fps=cap.get(cv2.CAP_PROP_FPS)) if use_scheduler else None
+    
+    # Per-hand caches of the last gesture, features, template and hash
+    memos = []
+    
+    # Capture, inference and rendering run as separate stages. Each hand-off
+    # holds only the latest frame, so a slow stage drops stale frames instead
+    # of adding latency.
+    frames = LatestQueue(maxsize=1)
+    decisions = LatestQueue(maxsize=1)
+    stop = threading.Event()
+    decision_latency = LatencyTracker()
+    display_latency = LatencyTracker()
+    
+    stages = [
+        threading.Thread(target=capture_stage, args=(cap, frames, stop), name="capture", daemon=True),
+        threading.Thread(target=inference_stage, name="inference", daemon=True,
+                         args=(frames, decisions, stop, roi_tracker, scheduler, memos, registry, current_user,
+                               decision_latency)),
+    ]
+    for stage in stages:
+        stage.start()
+    
+    # Render stage: HighGUI windows and key handling stay on the main thread
+    while True:
+        item = decisions.get(timeout=STAGE_TIMEOUT)
+        if item is None:
+            if decisions.closed:
+                break
+            cv2.waitKey(1)
+            continue
+        frame, frame_time, detections, roi = item
 
-            frame = cv2.flip(frame, 1)  # Mirror image for user-friendliness
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(rgb_frame)
-
-            gesture = "No Hand Detected"
-            gesture_hash = None
-            matched_gesture = None
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Draw hand landmarks on the frame
-                    mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                    
-                    # Get landmarks
-                    landmarks = hand_landmarks.landmark
-                    
-                    # Classify the gesture using the original method
-                    gesture = classify_gesture(landmarks)
-                    
-                    # Generate hash for the current gesture
-                    gesture_hash = get_gesture_hash(landmarks, salt=current_user)
-                    
-                    # Check if the hash exactly matches any registered gestures
-                    matched_gesture = None
-                    for name, registered_hash in registered_gestures.items():
-                        if gesture_hash == registered_hash:
-                            matched_gesture = name
-                            break
-                    
-                    # Display information on the frame
-                    cv2.putText(frame, f"Gesture: {gesture}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 
-                                0.8, (0, 255, 0), 2, cv2.LINE_AA)
-                    
-                    if matched_gesture:
-                        cv2.putText(frame, f"Matched: {matched_gesture}", (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 
-                                   0.8, (0, 255, 0), 2, cv2.LINE_AA)
-                    
-                    # Show hash for reference
-                    short_hash = gesture_hash if gesture_hash else "None"
-                    cv2.putText(frame, f"Hash: {short_hash}", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 
-                               0.8, (0, 255, 0), 2, cv2.LINE_AA)
-                    
-                    # Store last gesture hash in calibration mode
-                    if current_mode == "calibration" and calibration_gesture:
-                        cv2.putText(frame, f"Calibrating: {calibration_gesture} ({len(last_gestures)}/5)", 
-                                  (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2, cv2.LINE_AA)
-
-            # Display mode and instructions
-            mode_color = (0, 255, 255) if current_mode == "registration" else (255, 255, 255)
-            mode_color = (0, 165, 255) if current_mode == "calibration" else mode_color
+        gesture = "No Hand Detected"
+        gesture_hash = None
+        template = None
+        matched_gesture = None
+
+        for hand_landmarks, gesture, gesture_hash, template, matched_gesture in detections:
+            # Draw hand landmarks on the frame
+            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
             
-            cv2.putText(frame, f"Mode: {current_mode}", (10, frame.shape[0] - 100), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, mode_color, 2, cv2.LINE_AA)
+            # Display information on the frame
+            cv2.putText(frame, f"Gesture: {gesture}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 
+                        0.8, (0, 255, 0), 2, cv2.LINE_AA)
             
-            cv2.putText(frame, "R: Register | V: Verify | C: Calibrate | S: Save", 
-                       (10, frame.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
-            cv2.putText(frame, "L: Load gestures | Q: Quit", (10, frame.shape[0] - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+            if matched_gesture:
+                cv2.putText(frame, f"Matched: {matched_gesture}", (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 
+                           0.8, (0, 255, 0), 2, cv2.LINE_AA)
+            
+            # Show hash for reference
+            short_hash = gesture_hash if gesture_hash else "None"
+            cv2.putText(frame, f"Hash: {short_hash}", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 
+                       0.8, (0, 255, 0), 2, cv2.LINE_AA)
+            
+            # Store last gesture hash in calibration mode
+            if current_mode == "calibration" and calibration_gesture:
+                cv2.putText(frame, f"Calibrating: {calibration_gesture} ({len(last_gestures)}/5)", 
+                          (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2, cv2.LINE_AA)
+
+        # Show the region inference ran on and how long it took
+        if roi is not None:
+            cv2.rectangle(frame, roi[:2], roi[2:], (255, 128, 0), 1)
+        inference_text = f"Inference: {roi_tracker.last_inference_ms:.1f} ms ({'ROI' if roi else 'full'})"
+        if scheduler is not None:
+            stats = scheduler.stats()
+            inference_text += (f" | skip {stats['skip_ratio']:.0%} | {stats['effective_fps']:.1f}/"
+                               f"{stats['fps']:.1f} fps | stride {stats['stride']}")
+        if memos:
+            inference_text += f" | memo {memos[0].hit_rate:.0%}"
+        cv2.putText(frame, inference_text,
+                    (10, frame.shape[0] - 70), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.putText(frame, f"Latency: {decision_latency.stats()['p50_ms']:.0f} ms decision | "
+                           f"queues {len(frames)}/{len(decisions)} | dropped {frames.dropped}/{decisions.dropped}",
+                    (10, frame.shape[0] - 130), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
 
-            cv2.imshow("Gesture Recognition", frame)
+        # Display mode and instructions
+        mode_color = (0, 255, 255) if current_mode == "registration" else (255, 255, 255)
+        mode_color = (0, 165, 255) if current_mode == "calibration" else mode_color
+        
+        cv2.putText(frame, f"Mode: {current_mode}", (10, frame.shape[0] - 100), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, mode_color, 2, cv2.LINE_AA)
+        
+        cv2.putText(frame, "R: Register | V: Verify | C: Calibrate | S: Save", 
+                   (10, frame.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.putText(frame, "L: Load gestures | Q: Quit", (10, frame.shape[0] - 10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
 
-            key = cv2.waitKey(1) & 0xFF
+        cv2.imshow("Gesture Recognition", frame)
+        display_latency.add((time.monotonic() - frame_time) * 1000)
+
+        key = cv2.waitKey(1) & 0xFF
+        
+        if key == ord("r"):
+            # Switch to registration mode
+            current_mode = "registration"
+            print("Registration mode: Create a gesture and press 'S' to save")
             
-            if key == ord("r"):
-                # Switch to registration mode
-                current_mode = "registration"
-                print("Registration mode: Create a gesture and press 'S' to save")
-                
-            elif key == ord("v"):
-                # Switch to verification mode
+        elif key == ord("v"):
+            # Switch to verification mode
+            current_mode = "recognition"
+            print("Verification mode: Make a gesture to check matches")
+            
+        elif key == ord("c"):
+            # Switch to calibration mode
+            current_mode = "calibration"
+            last_gestures = []
+            calibration_gesture = input("Enter gesture name to calibrate: ")
+            print(f"Calibrating gesture '{calibration_gesture}'. Hold the gesture and press Space 5 times.")
+            
+        elif key == 32 and current_mode == "calibration" and gesture_hash and calibration_gesture:
+            # Space bar pressed during calibration - capture current gesture
+            last_gestures.append((gesture_hash, template))
+            print(f"Captured sample {len(last_gestures)}/5 for {calibration_gesture}")
+            
+            if len(last_gestures) >= 5:
+                # Use the most common hash as the registered one
+                most_common_hash = Counter(h for h, _ in last_gestures).most_common(1)[0][0]
+                most_common_template = next(t for h, t in last_gestures if h == most_common_hash)
+                registry.register(calibration_gesture, most_common_hash, most_common_template,
+                                  namespace=current_user)
+                print(f"Calibration complete: Registered '{calibration_gesture}' with hash: {most_common_hash}")
                 current_mode = "recognition"
-                print("Verification mode: Make a gesture to check matches")
-                
-            elif key == ord("c"):
-                # Switch to calibration mode
-                current_mode = "calibration"
                 last_gestures = []
-                calibration_gesture = input("Enter gesture name to calibrate: ")
-                print(f"Calibrating gesture '{calibration_gesture}'. Hold the gesture and press Space 5 times.")
-                
-            elif key == 32 and current_mode == "calibration" and gesture_hash and calibration_gesture:
-                # Space bar pressed during calibration - capture current gesture
-                last_gestures.append(gesture_hash)
-                print(f"Captured sample {len(last_gestures)}/5 for {calibration_gesture}")
-                
-                if len(last_gestures) >= 5:
-                    # Use the most common hash as the registered one
-                    from collections import Counter
-                    most_common_hash = Counter(last_gestures).most_common(1)[0][0]
-                    registered_gestures[calibration_gesture] = most_common_hash
-                    print(f"Calibration complete: Registered '{calibration_gesture}' with hash: {most_common_hash}")
-                    current_mode = "recognition"
-                    last_gestures = []
-                    calibration_gesture = None
-                
-            elif key == ord("s") and current_mode == "registration" and gesture_hash:
-                # Save the current gesture hash with a name
-                gesture_name = input("Enter a name for this gesture: ")
-                if gesture_name:
-                    registered_gestures[gesture_name] = gesture_hash
-                    print(f"Gesture '{gesture_name}' registered with hash: {gesture_hash}")
-                    save_gestures(registered_gestures)
-                    
-            elif key == ord("l"):
-                # Load gestures from file
-                registered_gestures = load_gestures()
-                print(f"Loaded {len(registered_gestures)} gestures")
+                calibration_gesture = None
+            
+        elif key == ord("s") and current_mode == "registration" and gesture_hash:
+            # Save the current gesture hash with a name
+            gesture_name = input("Enter a name for this gesture: ")
+            if gesture_name:
+                # Written out with any other registrations in the next batched flush
+                registry.register(gesture_name, gesture_hash, template, namespace=current_user)
+                print(f"Gesture '{gesture_name}' registered with hash: {gesture_hash}")
                 
-            elif key == ord("q"):
-                # Save gestures before quitting
-                save_gestures(registered_gestures)
-                break
+        elif key == ord("l"):
+            # Reload gestures from file
+            registry.refresh(force=True)
+            print(f"Loaded {len(registry)} gestures")
+            
+        elif key == ord("q"):
+            # Save gestures before quitting
+            registry.flush()
+            break
+
+    stop.set()
+    for stage in stages:
+        stage.join()
 
     cap.release()
     cv2.destroyAllWindows()
 
+    stats = roi_tracker.stats()
+    print(f"Inference: {stats['mean_inference_ms']:.1f} ms mean, "
+          f"{stats['roi_frames']} ROI / {stats['full_frames']} full-frame, {stats['reseeds']} re-seeds")
+    if scheduler is not None:
+        stats = scheduler.stats()
+        print(f"Scheduler: skipped {stats['skip_ratio']:.0%} of {stats['frames']} frames "
+              f"({stats['skipped_static']} static, {stats['skipped_stride']} over budget), "
+              f"{stats['effective_fps']:.1f} inferences/s at {stats['fps']:.1f} fps")
+    for hand_index, memo in enumerate(memos):
+        stats = memo.stats()
+        print(f"Hand {hand_index} memo: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate)")
+    for label, tracker in (("Glass-to-decision", decision_latency), ("Glass-to-display", display_latency)):
+        stats = tracker.stats()
+        print(f"{label}: p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+    print(f"Queues: capture max depth {frames.max_depth}, dropped {frames.dropped}/{frames.put_count}; "
+          f"decisions max depth {decisions.max_depth}, dropped {decisions.dropped}/{decisions.put_count}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Live gesture recognition and registration.")
+    parser.add_argument("source", nargs="?", help="frame source spec (default: camera or $FRAME_SOURCE)")
+    parser.add_argument("--no-roi", action="store_true", help="always run inference on the full frame")
+    parser.add_argument("--static-roi", action="store_true",
+                        help="move the crop with the hand every frame and detect afresh in it")
+    parser.add_argument("--every-frame", action="store_true", help="run inference on every frame, without motion gating")
+    args = parser.parse_args()
+    main(args.source, use_roi=not args.no_roi, use_scheduler=not args.every_frame, static_roi=args.static_roi)
\ No newline at end of file
@@ -0,0 +1,110 @@
+import math
+import time
+
+import cv2
+import numpy as np
+
+# Size of the grayscale thumbnail compared by the motion gate
+MOTION_SIZE = (64, 48)
+
+# A thumbnail pixel has changed when it differs by more than this (0-255);
+# averaging down to the thumbnail already removes most sensor noise
+PIXEL_THRESHOLD = 12
+
+# Share of changed thumbnail pixels below which a frame counts as static
+MOTION_THRESHOLD = 0.002
+
+# Run inference at least this often even on a static scene, so a hand held
+# perfectly still (or one that slips out slowly) is still picked up
+MAX_STATIC_FRAMES = 15
+
+# Upper bound for the adaptive stride
+MAX_STRIDE = 4
+
+# Smoothing for the inference latency estimate
+LATENCY_SMOOTHING = 0.2
+
+
+class InferenceScheduler:
+    """
+    Decides which frames of a live stream get inference.
+
+    A frame is skipped when the scene hasn't changed since the last inferred
+    frame (downsampled frame difference), or when inference is slower than the
+    frame budget, in which case only every stride-th frame is inferred. Callers
+    reuse the last landmarks and hash for skipped frames.
+    """
+
+    def __init__(self, fps=30.0, motion_threshold=MOTION_THRESHOLD,
+                 max_static_frames=MAX_STATIC_FRAMES, max_stride=MAX_STRIDE):
+        self.frame_budget_ms = 1000.0 / (fps if fps and fps > 0 else 30.0)
+        self.motion_threshold = motion_threshold
+        self.max_static_frames = max_static_frames
+        self.max_stride = max_stride
+
+        self.stride = 1
+        self.latency_ms = None  # smoothed inference latency
+        self.last_motion = 0.0
+        self._reference = None  # thumbnail of the last inferred frame
+        self._frames_since_inference = 0
+
+        self.frames = 0
+        self.inferred = 0
+        self.skipped_static = 0
+        self.skipped_stride = 0
+        self.started = None
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def should_infer(self, frame):
+        """Whether inference should run on this frame."""
+        if self.started is None:
+            self.started = time.monotonic()
+        self.frames += 1
+        self._frames_since_inference += 1
+
+        if self._reference is not None and self._frames_since_inference < self.stride:
+            self.skipped_stride += 1
+            return False
+
+        thumbnail = self._thumbnail(frame)
+        if self._reference is not None:
+            changed = cv2.absdiff(thumbnail, self._reference) > PIXEL_THRESHOLD
+            self.last_motion = np.count_nonzero(changed) / changed.size
+            if self.last_motion < self.motion_threshold and self._frames_since_inference < self.max_static_frames:
+                self.skipped_static += 1
+                return False
+
+        self._accept(thumbnail)
+        return True
+
+    def _accept(self, thumbnail):
+        self._reference = thumbnail
+        self._frames_since_inference = 0
+        self.inferred += 1
+
+    def record_latency(self, latency_ms):
+        """Feed back how long inference took and adapt the stride to the frame budget."""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += LATENCY_SMOOTHING * (latency_ms - self.latency_ms)
+        self.stride = min(self.max_stride, max(1, math.ceil(self.latency_ms / self.frame_budget_ms)))
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        return {
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skip_ratio": 1 - self.inferred / self.frames if self.frames else 0.0,
+            "skipped_static": self.skipped_static,
+            "skipped_stride": self.skipped_stride,
+            "stride": self.stride,
+            "latency_ms": self.latency_ms or 0.0,
+            "fps": self.frames / elapsed if elapsed else 0.0,
+            "effective_fps": self.inferred / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+class LandmarkFrame:
+    """
+    One detected hand: the 21 MediaPipe landmarks copied once into a contiguous
+    float32 (21, 3) array of x, y, z, plus the handedness label and capture timestamp.
+    """
+
+    __slots__ = ("points", "handedness", "timestamp")
+
+    def __init__(self, points, handedness=None, timestamp=None):
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        if points.shape != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Expected landmarks of shape ({NUM_LANDMARKS}, 3), got {points.shape}")
+        self.points = points
+        self.handedness = handedness
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+
+    @classmethod
+    def from_mediapipe(cls, hand_landmarks, handedness=None, timestamp=None):
+        """Build a frame from a MediaPipe NormalizedLandmarkList (or its .landmark list)."""
+        landmarks = getattr(hand_landmarks, "landmark", hand_landmarks)
+        points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        for i, lm in enumerate(landmarks):
+            points[i] = (lm.x, lm.y, lm.z)
+
+        # multi_handedness entries are ClassificationLists, take the top label
+        if handedness is not None and hasattr(handedness, "classification"):
+            handedness = handedness.classification[0].label
+
+        return cls(points, handedness, timestamp)
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+    def __repr__(self):
+        return f"LandmarkFrame(handedness={self.handedness!r}, timestamp={self.timestamp:.3f})"
+
+
+def as_landmark_array(landmarks):
+    """
+    Return landmarks as a (21, 3) array of x, y, z.
+    Accepts a LandmarkFrame, an array, or a sequence of objects with .x/.y/.z.
+    """
+    if isinstance(landmarks, LandmarkFrame):
+        return landmarks.points
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    # Keep full precision for plain Python floats so hashes don't change
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
@@ -0,0 +1,82 @@
+import threading
+from collections import deque
+
+# Recent samples kept for latency percentiles
+LATENCY_WINDOW = 300
+
+
+class LatestQueue:
+    """
+    Bounded hand-off between pipeline stages where the latest item wins.
+
+    put() never blocks: when the queue is full the oldest item is dropped, so a
+    slow consumer sees fresh frames instead of a growing backlog.
+    """
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Next item, or None on timeout or once the queue is closed and empty."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed, timeout)
+            return self._items.popleft() if self._items else None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+
+class LatencyTracker:
+    """Running latency statistics in milliseconds."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, latency_ms):
+        with self._lock:
+            self.recent.append(latency_ms)
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+
+    def stats(self):
+        with self._lock:
+            recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": recent[len(recent) // 2] if recent else 0.0,
+            "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0,
+            "max_ms": self.max_ms,
+        }
@@ -0,0 +1,166 @@
+import time
+
+import cv2
+
+# Padding added around the previous frame's hand bounding box, as a fraction of its larger side
+ROI_PADDING = 0.35
+
+# Longest side (pixels) of the image handed to MediaPipe for ROI crops and full-frame detection
+ROI_MAX_SIDE = 256
+FULL_FRAME_MAX_SIDE = 640
+
+# Boxes smaller than this (pixels) are treated as lost tracking
+ROI_MIN_SIDE = 32
+
+# In tracking mode the crop stays put while the hand's box keeps this fraction
+# of the crop's side away from its edges and fills at least ROI_MIN_FILL of
+# it; otherwise the crop is re-seeded around the hand
+ROI_KEEP_MARGIN = 0.05
+ROI_MIN_FILL = 0.3
+
+
+def _downscale(image, max_side):
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+class RoiTracker:
+    """
+    Region-of-interest inference for the live tracker.
+
+    Once a hand has been found, the next frame is cropped to the padded bounding
+    box of its landmarks and downscaled before inference, and the landmarks are
+    mapped back to full-frame coordinates. When no hand is found the tracker
+    falls back to (downscaled) full-frame detection.
+
+    MediaPipe's tracking mode skips palm detection by reusing the previous
+    frame's landmarks, in input image coordinates. With tracking=True (the
+    default) the crop therefore stays put while the hand moves inside it and
+    is only re-seeded when the hand nears its edge; each time the input
+    moves, the graph is reset so it detects afresh once. With tracking=False
+    the crop follows the hand every frame and the graph must run in static
+    image mode, detecting the palm on every frame. Create the graph with
+    hands_options() either way.
+    """
+
+    def __init__(self, padding=ROI_PADDING, max_side=ROI_MAX_SIDE,
+                 full_frame_max_side=FULL_FRAME_MAX_SIDE, enabled=True, tracking=True):
+        self.padding = padding
+        self.max_side = max_side
+        self.full_frame_max_side = full_frame_max_side
+        self.enabled = enabled
+        self.tracking = tracking
+        self.roi = None  # (x0, y0, x1, y1) in pixels, or None for full frame
+        self._input_roi = None  # the crop the graph last saw, None for full frame
+
+        # Stats for tuning
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.reseeds = 0
+        self.last_inference_ms = 0.0
+        self.total_inference_ms = 0.0
+
+    def hands_options(self):
+        """Keyword arguments for mp_hands.Hands that suit this tracker."""
+        # Crops that follow the hand every frame need detecting from scratch
+        return {"static_image_mode": self.enabled and not self.tracking}
+
+    def process(self, hands, frame):
+        """
+        Run hands.process on the ROI (or the full frame) of a BGR frame and
+        return the results with landmarks in full-frame normalized coordinates.
+        The landmarks in the returned results are rewritten in place.
+        """
+        roi = self.roi if self.enabled else None
+        if roi != self._input_roi:
+            if self.tracking:
+                # The graph's tracked landmarks belong to the old input
+                reset = getattr(hands, "reset", None)
+                if reset is not None:
+                    reset()
+                self.reseeds += 1
+            self._input_roi = roi
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            # Crop is a view; only the downscaled crop is converted
+            image = _downscale(frame[y0:y1, x0:x1], self.max_side)
+            self.roi_frames += 1
+        else:
+            image = _downscale(frame, self.full_frame_max_side)
+            self.full_frames += 1
+
+        start = time.perf_counter()
+        results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        self.last_inference_ms = (time.perf_counter() - start) * 1000
+        self.total_inference_ms += self.last_inference_ms
+
+        if roi is not None and results.multi_hand_landmarks:
+            self._map_to_frame(results.multi_hand_landmarks, roi, frame.shape)
+
+        self._update_roi(results, frame.shape)
+        return results
+
+    @staticmethod
+    def _map_to_frame(multi_hand_landmarks, roi, frame_shape):
+        # Modifies the landmarks in place; they belong to this frame's results only
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        crop_w = x1 - x0
+        crop_h = y1 - y0
+        for hand_landmarks in multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * crop_w) / width
+                lm.y = (y0 + lm.y * crop_h) / height
+                # z uses the same scale as x
+                lm.z = lm.z * crop_w / width
+
+    def _update_roi(self, results, frame_shape):
+        if not self.enabled or not results.multi_hand_landmarks:
+            # Tracking lost: detect on the full frame next time
+            self.roi = None
+            return
+
+        height, width = frame_shape[:2]
+        landmarks = results.multi_hand_landmarks[0].landmark
+        xs = [lm.x * width for lm in landmarks]
+        ys = [lm.y * height for lm in landmarks]
+        box_side = max(max(xs) - min(xs), max(ys) - min(ys))
+        if self.tracking and self.roi is not None and self._keeps_crop(min(xs), min(ys), max(xs), max(ys),
+                                                                       box_side, frame_shape):
+            return
+        pad = box_side * self.padding
+
+        x0 = max(0, int(min(xs) - pad))
+        y0 = max(0, int(min(ys) - pad))
+        x1 = min(width, int(max(xs) + pad))
+        y1 = min(height, int(max(ys) + pad))
+
+        if x1 - x0 < ROI_MIN_SIDE or y1 - y0 < ROI_MIN_SIDE:
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
+
+    def _keeps_crop(self, bx0, by0, bx1, by1, box_side, frame_shape):
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = self.roi
+        crop_side = max(x1 - x0, y1 - y0)
+        if box_side < crop_side * ROI_MIN_FILL:
+            return False
+        # Edges of the crop on the frame border can't be moved past anyway
+        margin = crop_side * ROI_KEEP_MARGIN
+        return ((x0 == 0 or bx0 >= x0 + margin) and (y0 == 0 or by0 >= y0 + margin)
+                and (x1 == width or bx1 <= x1 - margin) and (y1 == height or by1 <= y1 - margin))
+
+    def stats(self):
+        frames = self.roi_frames + self.full_frames
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "roi_ratio": self.roi_frames / frames if frames else 0.0,
+            "reseeds": self.reseeds,
+            "last_inference_ms": self.last_inference_ms,
+            "mean_inference_ms": self.total_inference_ms / frames if frames else 0.0,
+        }
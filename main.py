@@ -1,12 +1,35 @@
 # main.py
+# Only PySide6 and the landing page are imported up front, so the window
+# appears before MediaPipe, OpenCV and NumPy have loaded. Those come in with
+# the auth pages, on a background warm-up thread or on first use.
+from client.startup import profile  # first, so startup times count from here
+import argparse
 import sys
+import threading
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget
 from client.landing_page import LandingPage
-from client.login_page import LoginPage
-from client.signup_page import SignupPage
-from client.passwords_page import PasswordsPage
-from client.camera_manager import release_camera
-from db.handle_db import init_db
+
+# Modules behind the login, sign up and passwords pages, heaviest first
+APP_MODULES = (
+    "numpy",
+    "cv2",
+    "hands.gesture_pipeline",
+    "hands.burst_auth",
+    "db.handle_db",
+    "client.camera_manager",
+    "client.login_page",
+    "client.signup_page",
+    "client.passwords_page",
+)
+
+# How long the warm-up waits for the camera's first frame, in seconds
+CAMERA_WARM_UP_TIMEOUT = 10.0
+
+# Command line settings, applied once the app modules are loaded
+_app_args = None
+_app_lock = threading.Lock()
+_app_loaded = False
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +45,7 @@ class MainWindow(QMainWindow):
         self.landing_page = LandingPage(self)
         self.login_page = None  # Initialize when needed
         self.signup_page = None  # Initialize when needed
+        self.passwords_page = None  # Initialize when needed, then reused for every login
 
         self.stack.addWidget(self.landing_page)
         self.stack.setCurrentIndex(0)
@@ -29,6 +53,8 @@ class MainWindow(QMainWindow):
     def go_to_login(self):
         # Create login page when needed
         if self.login_page is None:
+            load_app_modules()
+            from client.login_page import LoginPage
             self.login_page = LoginPage(self)
             self.stack.addWidget(self.login_page)
         self.stack.setCurrentWidget(self.login_page)
@@ -36,6 +62,8 @@ class MainWindow(QMainWindow):
     def go_to_signup(self):
         # Create signup page when needed
         if self.signup_page is None:
+            load_app_modules()
+            from client.signup_page import SignupPage
             self.signup_page = SignupPage(self)
             self.stack.addWidget(self.signup_page)
         self.stack.setCurrentWidget(self.signup_page)
@@ -44,21 +72,141 @@ class MainWindow(QMainWindow):
         self.stack.setCurrentWidget(self.landing_page)
 
     def go_to_passwords(self, user_name):
-        # Create a new PasswordsPage with the provided user_data and navigate to it
-        self.passwords_page = PasswordsPage(self, user_name)
-        self.stack.addWidget(self.passwords_page)
+        # Create the PasswordsPage on the first login, then switch it to the new user
+        if self.passwords_page is None:
+            load_app_modules()
+            from client.passwords_page import PasswordsPage
+            self.passwords_page = PasswordsPage(self, user_name)
+            self.stack.addWidget(self.passwords_page)
+        else:
+            self.passwords_page.set_user(user_name)
         self.stack.setCurrentWidget(self.passwords_page)
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Gesture password manager")
+    parser.add_argument("--source", help="frame source instead of the camera, e.g. "
+                        "videos/Project_Demo_Login.mp4, images:<dir> or synthetic (default: $FRAME_SOURCE)")
+    parser.add_argument("--fast", action="store_true",
+                        help="play video/image/synthetic sources as fast as possible instead of in real time")
+    parser.add_argument("--detector", help="hand detector backend: mediapipe, fake[:<latency ms>] "
+                        "or replay:<poses.npy>[@<latency ms>] (default: $HAND_DETECTOR or mediapipe)")
+    # Defaults live in camera_manager and frame_dispatcher, which aren't imported yet
+    parser.add_argument("--camera-idle-timeout", type=float,
+                        help="seconds the camera stays open after leaving the login/sign up pages (default: 30)")
+    parser.add_argument("--display-fps", type=float,
+                        help="camera preview refresh rate, independent of the camera's (default: 30)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print module import times and time to first window, detector and camera frame")
+    # Leave anything else (e.g. Qt options) for QApplication
+    return parser.parse_known_args(argv[1:])
+
+
+def load_app_modules():
+    """
+    Import the auth pages with their camera, hand tracking and database
+    modules, and apply the command line settings. Runs once, on whichever
+    thread needs them first; the other waits.
+    """
+    global _app_loaded
+
+    with _app_lock:
+        if _app_loaded:
+            return
+        for name in APP_MODULES:
+            profile.timed_import(name)
+
+        from client.camera_manager import set_camera_idle_timeout, set_frame_source
+        from client.frame_dispatcher import set_display_fps
+        from db.handle_db import init_db
+        from hands.detectors import set_hand_detector_backend
+
+        args = _app_args
+        if args is not None:
+            set_frame_source(args.source, realtime=False if args.fast else None)
+            set_hand_detector_backend(args.detector)
+            if args.camera_idle_timeout is not None:
+                set_camera_idle_timeout(args.camera_idle_timeout)
+            if args.display_fps is not None:
+                set_display_fps(args.display_fps)
+        init_db()
+        _app_loaded = True
+    profile.mark("app modules loaded")
+
+
+def warm_up(report=False):
+    """
+    Background start-up work after the window is shown: load the app
+    modules, open the camera and initialise the hand detectors, so the first
+    login or signup doesn't pay for them. Failures are logged; the pages
+    load whatever is missing again when they are opened.
+    """
+    lease = None
+    try:
+        load_app_modules()
+        from client.camera_manager import acquire_camera
+        from hands.burst_auth import warm_up_burst_workers
+        from hands.gesture_pipeline import warm_up_hand_detector
+
+        # The camera opens on its own thread meanwhile; the lease is dropped at
+        # the end, so it stays open for the idle timeout and reopens quickly later
+        lease = acquire_camera()
+        try:
+            workers = warm_up_burst_workers()
+            warm_up_hand_detector()
+            profile.mark("hand detector ready")
+            for future in workers:
+                future.result()
+            profile.mark("burst workers ready")
+        except Exception as e:
+            print(f"Error warming up the hand detector: {e}")
+
+        if lease.wait_for_frame(CAMERA_WARM_UP_TIMEOUT) is not None:
+            profile.mark("camera first frame")
+    except Exception as e:
+        print(f"Error during start-up warm-up: {e}")
+    finally:
+        if lease is not None:
+            lease.release()
+        if report:
+            print(profile.report())
+
+
+def shutdown():
+    # Release only what was loaded; importing anything now would just slow quitting.
+    # Wait for submissions still running in the background first.
+    jobs = sys.modules.get("client.auth_jobs")
+    if jobs is not None:
+        jobs.wait_for_jobs()
+    camera_manager = sys.modules.get("client.camera_manager")
+    if camera_manager is not None:
+        camera_manager.release_camera()
+    gesture_pipeline = sys.modules.get("hands.gesture_pipeline")
+    if gesture_pipeline is not None:
+        gesture_pipeline.release_hand_detector()
+    burst_auth = sys.modules.get("hands.burst_auth")
+    if burst_auth is not None:
+        burst_auth.release_burst_workers()
+
+
 def main():
-    init_db()
-    app = QApplication(sys.argv)
-    
-    # Make sure to release the camera when the app closes
-    app.aboutToQuit.connect(release_camera)
-    
+    global _app_args
+
+    args, qt_args = parse_args(sys.argv)
+    _app_args = args
+
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    # Make sure to release the camera and hand detector when the app closes
+    app.aboutToQuit.connect(shutdown)
+
     window = MainWindow()
     window.show()
+    profile.mark("window created")
+
+    # Runs once the first paint has gone through the event loop
+    QTimer.singleShot(0, lambda: profile.mark("landing page shown"))
+    threading.Thread(target=warm_up, args=(args.profile_startup,), name="warm-up", daemon=True).start()
     sys.exit(app.exec())
 
 
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Headless: the fake hand detector instead of MediaPipe, and no display for Qt
+os.environ.setdefault("HAND_DETECTOR", "fake")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Import the packages from the repository root, wherever pytest is started
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from hands import batch_analyzer
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(12):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def frames_of(records):
+    return sorted((record["path"], record["frame_index"]) for record in records if "frame_index" in record)
+
+
+def test_load_checkpoint_cuts_a_partial_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"run": {"salt": "user1", "every": 1}}\n'
+                      '{"path": "a.mp4", "frame_index": 0}\n'
+                      '{"path": "a.mp4", "frame_count": 5}\n'
+                      '{"path": "a.mp4", "fra')
+
+    params, completed, frame_counts = batch_analyzer.load_checkpoint(str(output))
+    assert params == {"salt": "user1", "every": 1}
+    assert completed == {("a.mp4", 0)}
+    assert frame_counts == {"a.mp4": 5}
+    assert output.read_text().endswith("}\n")
+
+
+def test_a_known_frame_count_completes_overestimated_chunks():
+    task = ("a.mp4#0-10", "a.mp4", 0, 10)
+    assert batch_analyzer._task_frames(task, 2, {}) == [("a.mp4", i) for i in (0, 2, 4, 6, 8)]
+    assert batch_analyzer._task_frames(task, 2, {"a.mp4": 5}) == [("a.mp4", i) for i in (0, 2, 4)]
+    assert batch_analyzer._task_frames(("a.mp4#10-20", "a.mp4", 10, 20), 1, {"a.mp4": 5}) == []
+    assert batch_analyzer._task_frames(("a.mp4#0-", "a.mp4", 0, None), 1, {}) is None
+
+
+def test_task_records_report_where_the_video_ended(video):
+    records = list(batch_analyzer.task_records((video, video, 8, 30), "user1"))
+    assert [record.get("frame_index") for record in records[:-1]] == [8, 9, 10, 11]
+    assert records[-1] == {"path": video, "frame_count": 12}
+
+
+def test_run_resumes_and_refuses_other_settings(tmp_path, video):
+    output = str(tmp_path / "results.jsonl")
+    assert batch_analyzer.run([video], output, workers=1, frame_step=2, chunk_frames=4) == 6
+
+    # Drop the last frame's record and leave half a line, as an interrupted run would
+    lines = open(output).read().splitlines(keepends=True)
+    with open(output, "w") as f:
+        f.writelines(lines[:-1])
+        f.write(lines[-1][:10])
+    assert batch_analyzer.run([video], output, workers=1, frame_step=2, chunk_frames=5) == 1
+
+    records = read_records(output)
+    assert records[0] == {"run": {"salt": "user1", "every": 2}}
+    assert frames_of(records) == [(video, i) for i in range(0, 12, 2)]
+
+    assert batch_analyzer.run([video], output, workers=1, frame_step=1) is None
+    assert batch_analyzer.run([video], output, salt="bob", workers=1, frame_step=2) is None
+    assert batch_analyzer.run([video], output, salt="bob", workers=1, frame_step=2, restart=True) == 6
+    assert read_records(output)[0] == {"run": {"salt": "bob", "every": 2}}
@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+from camera.frame_ring import FrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create((4, 6, 3), slots=4)
+    yield ring
+    ring.close()
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_empty_ring_has_no_frame(ring):
+    assert ring.latest() is None
+    assert ring.get(1) is None
+    assert ring.wait_for_next(0, timeout=0.01) is None
+
+
+def test_write_and_read_back(ring):
+    assert ring.write(frame(7), timestamp=1.5) == 1
+    sequence, view, timestamp = ring.latest()
+    assert (sequence, timestamp) == (1, 1.5)
+    assert (view == 7).all()
+
+
+def test_views_are_invalidated_when_the_slot_is_reused(ring):
+    ring.write(frame(1))
+    sequence, view, _ = ring.latest()
+    for value in range(2, 2 + ring.slots - 1):
+        ring.write(frame(value))
+    assert ring.still_valid(sequence)
+    ring.write(frame(99))
+    assert not ring.still_valid(sequence)
+    assert ring.get(sequence) is None
+    assert ring.latest_sequence == ring.slots + 1
+
+
+def test_copies_outlive_the_slot(ring):
+    ring.write(frame(1))
+    _, copy, _ = ring.latest(copy=True)
+    for value in range(ring.slots):
+        ring.write(frame(50 + value))
+    assert (copy == 1).all()
+
+
+def test_wait_for_next_sees_a_frame_from_another_thread(ring):
+    writer = threading.Timer(0.05, ring.write, args=(frame(3),))
+    writer.start()
+    sequence, view, _ = ring.wait_for_next(0, timeout=5)
+    writer.join()
+    assert sequence == 1 and (view == 3).all()
+
+
+def _read_latest(name, results):
+    ring = FrameRing.attach(name)
+    try:
+        sequence, view, _ = ring.latest()
+        results.put((sequence, int(view[0, 0, 0])))
+    finally:
+        ring.close()
+
+
+def test_another_process_attaches_by_name(ring):
+    ring.write(frame(42))
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    reader = context.Process(target=_read_latest, args=(ring.name, results))
+    reader.start()
+    assert results.get(timeout=30) == (1, 42)
+    reader.join(timeout=30)
+    assert reader.exitcode == 0
+
+
+def test_attach_rejects_other_shared_memory():
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=4096)
+    try:
+        with pytest.raises(ValueError):
+            FrameRing.attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from hands.detectors import make_synthetic_poses
+from hands.gesture_conversions import TEMPLATE_STATE_WEIGHT, get_gesture_hash, get_gesture_template
+from hands.gesture_index import (
+    MATCH_TOLERANCE,
+    BKTree,
+    GestureIndex,
+    feature_distance,
+    verify_gesture,
+)
+
+
+def test_feature_distance_is_l1():
+    assert feature_distance([1, 2, 3], [3, 2, 0]) == 5
+    with pytest.raises(ValueError):
+        feature_distance([1, 2], [1, 2, 3])
+
+
+def test_bktree_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    templates = [tuple(int(v) for v in row) for row in rng.integers(0, 12, size=(300, 8))]
+    tree = BKTree()
+    for i, template in enumerate(templates):
+        tree.add(template, i)
+    assert len(tree) == len(templates)
+
+    for query in templates[:20]:
+        for tolerance in (0, 3, 8):
+            expected = sorted(i for i, template in enumerate(templates)
+                              if feature_distance(query, template) <= tolerance)
+            found = tree.search(query, tolerance)
+            assert sorted(item for _, item in found) == expected
+            distances = [distance for distance, _ in found]
+            assert distances == sorted(distances)
+
+
+def test_bktree_keeps_items_with_the_same_template():
+    tree = BKTree()
+    tree.add([1, 2, 3], "a")
+    tree.add([1, 2, 3], "b")
+    assert sorted(item for _, item in tree.search([1, 2, 3], 0)) == ["a", "b"]
+
+
+def test_match_picks_the_closest_template_within_tolerance():
+    index = GestureIndex()
+    index.add("near", "hash-a", [5] * 8 + [0] * 5)
+    index.add("far", "hash-b", [9] * 8 + [0] * 5)
+
+    assert index.match("other-hash", [5] * 7 + [6] + [0] * 5) == "near"
+    assert index.match("hash-a", [0] * 13) is None
+
+
+def test_match_without_a_template_uses_the_hash():
+    index = GestureIndex.from_registered({
+        "legacy": "hash-a",
+        "new": {"hash": "hash-b", "template": [1] * 13},
+    })
+    assert index.match("hash-a") == "legacy"
+    assert index.match("hash-b") == "new"
+    # Entries saved without a template still match their exact hash
+    assert index.match("hash-a", [7] * 13) == "legacy"
+    assert index.names_for_hash("hash-b") == ["new"]
+
+
+def test_a_flipped_finger_is_never_within_tolerance():
+    assert TEMPLATE_STATE_WEIGHT > MATCH_TOLERANCE
+    enrolled = [5] * 8 + [TEMPLATE_STATE_WEIGHT, 0, 0, 0, 0]
+    attempt = [5] * 8 + [0, 0, 0, 0, 0]
+    assert not verify_gesture("h", attempt, "h", enrolled)
+
+
+def test_verify_gesture_accepts_small_drift_of_a_real_pose():
+    pose = make_synthetic_poses(1)[0]
+    enrolled_hash, enrolled_template = get_gesture_hash(pose, salt="alice"), get_gesture_template(pose)
+
+    assert verify_gesture(enrolled_hash, enrolled_template, enrolled_hash, enrolled_template)
+    drifted = list(enrolled_template)
+    drifted[0] += 1
+    assert verify_gesture(enrolled_hash, drifted, enrolled_hash, enrolled_template)
+    drifted[1] += MATCH_TOLERANCE
+    assert not verify_gesture(enrolled_hash, drifted, enrolled_hash, enrolled_template)
+
+
+def test_verify_gesture_without_an_enrolled_template_needs_the_exact_hash():
+    assert verify_gesture("h", [1] * 13, "h")
+    assert not verify_gesture("x", [1] * 13, "h")
+    assert not verify_gesture(None, [1] * 13, "h", [1] * 13)
+    assert not verify_gesture("h", None, "h", [1] * 13)
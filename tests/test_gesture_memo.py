@@ -0,0 +1,46 @@
+import numpy as np
+
+from hands.detectors import make_synthetic_poses
+from hands.gesture_conversions import get_gesture_features_and_template, hash_gesture_features
+from hands.gesture_memo import GestureMemo
+from hands.gesture_pipeline import classify_gesture
+
+
+def recompute(points, salt):
+    features, template = get_gesture_features_and_template(points)
+    return {
+        "gesture": classify_gesture(points),
+        "features": features,
+        "template": template,
+        "gesture_hash": hash_gesture_features(features, salt=salt),
+    }
+
+
+def test_a_still_hand_is_served_from_the_cache():
+    memo = GestureMemo(salt="alice")
+    pose = make_synthetic_poses(1)[0]
+    first = memo.lookup(pose)
+    for _ in range(5):
+        assert memo.lookup(pose.copy()) is first
+    assert (memo.hits, memo.misses) == (5, 1)
+    assert first == recompute(pose, "alice")
+
+
+def test_cached_results_match_a_recompute_while_the_hand_drifts():
+    rng = np.random.default_rng(1)
+    memo = GestureMemo(salt="alice")
+    for pose in make_synthetic_poses(20, seed=3):
+        points = pose.astype(np.float64)
+        for _ in range(30):
+            points = points + rng.normal(0.0, 0.0005, size=points.shape)
+            assert memo.lookup(points) == recompute(points, "alice")
+    assert memo.hits > 0 and memo.misses > 0
+
+
+def test_reset_forgets_the_cached_pose():
+    memo = GestureMemo()
+    pose = make_synthetic_poses(1)[0]
+    memo.lookup(pose)
+    memo.reset()
+    memo.lookup(pose)
+    assert memo.misses == 2
@@ -0,0 +1,62 @@
+import json
+import os
+
+from hands.gesture_registry import LEGACY_NAMESPACE, GestureRegistry
+
+TEMPLATE = [3, 5, 5, 6, 2, 4, 1, 1, 12, 0, 12, 0, 12]
+
+
+def make_registry(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", 0)
+    return GestureRegistry(str(tmp_path / "saved_gestures.json"), **kwargs)
+
+
+def test_register_writes_the_file_and_matches(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.register("wave", "hash-a", TEMPLATE, namespace="alice")
+
+    with open(registry.filename) as f:
+        data = json.load(f)
+    assert data["namespaces"]["alice"]["wave"] == {"hash": "hash-a", "template": TEMPLATE}
+    assert registry.match("other", TEMPLATE[:-1] + [11], namespace="alice") == "wave"
+    assert registry.match("hash-a", TEMPLATE, namespace="bob") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_batched_writes_wait_for_flush(tmp_path):
+    registry = make_registry(tmp_path, flush_interval=60)
+    registry.register("wave", "hash-a", TEMPLATE)
+    assert not os.path.exists(registry.filename)
+    assert registry.match("hash-a") == "wave"
+
+    registry.flush()
+    assert make_registry(tmp_path).get("wave") == {"hash": "hash-a", "template": TEMPLATE}
+
+
+def test_changes_from_another_registry_are_picked_up(tmp_path):
+    first = make_registry(tmp_path)
+    second = make_registry(tmp_path)
+    first.register("wave", "hash-a", TEMPLATE)
+    second.register("fist", "hash-b")
+
+    # Each flush re-reads the file first, so neither write is lost
+    assert sorted(name for name, _ in first.items()) == ["fist", "wave"]
+    assert sorted(name for name, _ in second.items()) == ["fist", "wave"]
+
+
+def test_remove(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.register("wave", "hash-a", TEMPLATE)
+    registry.remove("wave")
+    assert registry.match("hash-a", TEMPLATE) is None
+    assert len(make_registry(tmp_path)) == 0
+
+
+def test_legacy_flat_file_keeps_only_the_hash(tmp_path):
+    with open(tmp_path / "saved_gestures.json", "w") as f:
+        json.dump({"wave": "hash-a", "fist": {"hash": "hash-b", "features": [1, 0, 1]}}, f)
+
+    registry = make_registry(tmp_path)
+    assert registry.get("fist", namespace=LEGACY_NAMESPACE) == {"hash": "hash-b", "template": None}
+    assert registry.match("hash-a") == "wave"
+    assert registry.match("hash-b", TEMPLATE) == "fist"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from hands.inference_scheduler import MAX_STRIDE, InferenceScheduler
+
+
+def frame(value):
+    return np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def test_static_frames_are_skipped_until_the_limit():
+    scheduler = InferenceScheduler(max_static_frames=5)
+    decisions = [scheduler.should_infer(frame(100)) for _ in range(11)]
+    assert decisions == [True, False, False, False, False, True, False, False, False, False, True]
+    assert scheduler.skipped_static == 8
+
+
+def test_motion_is_inferred():
+    scheduler = InferenceScheduler()
+    assert scheduler.should_infer(frame(0))
+    assert scheduler.should_infer(frame(200))
+    assert scheduler.last_motion == 1.0
+
+
+def test_stride_follows_the_latency():
+    scheduler = InferenceScheduler(fps=30)
+    scheduler.record_latency(10)
+    assert scheduler.stride == 1
+    scheduler.record_latency(10 + 70 / 0.2)  # smoothed to 80 ms, over two frame budgets
+    assert scheduler.stride == 3
+    for _ in range(50):
+        scheduler.record_latency(1000)
+    assert scheduler.stride == MAX_STRIDE
+
+
+def test_frames_within_the_stride_are_skipped_even_with_motion():
+    scheduler = InferenceScheduler(fps=30)
+    scheduler.record_latency(80)
+    decisions = [scheduler.should_infer(frame(i * 50 % 256)) for i in range(7)]
+    assert decisions == [True, False, False, True, False, False, True]
+    stats = scheduler.stats()
+    assert (stats["frames"], stats["inferred"], stats["skipped_stride"]) == (7, 3, 4)
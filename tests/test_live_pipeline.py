@@ -0,0 +1,48 @@
+import threading
+
+from hands.live_pipeline import LatencyTracker, LatestQueue
+
+
+def test_latest_item_wins_when_full():
+    queue = LatestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+    assert len(queue) == 2
+    assert (queue.get(), queue.get()) == (3, 4)
+    assert (queue.put_count, queue.dropped, queue.max_depth) == (5, 3, 2)
+
+
+def test_get_times_out_empty():
+    assert LatestQueue().get(timeout=0.01) is None
+
+
+def test_close_wakes_a_waiting_consumer():
+    queue = LatestQueue()
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(queue.get()))
+    consumer.start()
+    queue.close()
+    consumer.join(timeout=5)
+    assert not consumer.is_alive()
+    assert results == [None] and queue.closed
+
+
+def test_items_put_before_close_are_still_delivered():
+    queue = LatestQueue()
+    queue.put("frame")
+    queue.close()
+    assert queue.get() == "frame"
+    assert queue.get() is None
+
+
+def test_latency_tracker_stats():
+    tracker = LatencyTracker(window=10)
+    assert tracker.stats()["count"] == 0
+    for latency_ms in range(1, 21):
+        tracker.add(float(latency_ms))
+    stats = tracker.stats()
+    assert stats["count"] == 20
+    assert stats["mean_ms"] == 10.5
+    assert stats["max_ms"] == 20.0
+    # Percentiles only cover the recent window
+    assert stats["p50_ms"] == 16.0
@@ -0,0 +1,67 @@
+import pytest
+
+from db import handle_db
+
+
+@pytest.fixture
+def vault_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(handle_db, "DB_PATH", str(tmp_path / "password_manager.db"))
+    handle_db.init_db()
+    handle_db.insert_vault_entries("alice", [(f"site{i:03d}", f"secret{i}") for i in range(25)])
+    handle_db.insert_vault_entries("alice", [("100%_off", "a"), ("100x_off", "b"), ("back\\slash", "c")])
+    handle_db.insert_vault_entries("bob", [("site000", "bobs")])
+    return handle_db
+
+
+def usernames(rows):
+    return [username for _, username in rows]
+
+
+def test_pages_follow_on_from_the_last_id(vault_db):
+    first = vault_db.fetch_vault_page("alice", limit=10)
+    second = vault_db.fetch_vault_page("alice", first[-1][0], limit=10)
+    assert usernames(first) == [f"site{i:03d}" for i in range(10)]
+    assert usernames(second) == [f"site{i:03d}" for i in range(10, 20)]
+    assert len(vault_db.fetch_vault_page("alice", limit=1000)) == 28
+
+
+def test_search_matches_wildcards_literally(vault_db):
+    assert usernames(vault_db.fetch_vault_page("alice", search="%_")) == ["100%_off"]
+    assert usernames(vault_db.fetch_vault_page("alice", search="%")) == ["100%_off"]
+    assert usernames(vault_db.fetch_vault_page("alice", search="0_")) == []
+    assert usernames(vault_db.fetch_vault_page("alice", search="\\")) == ["back\\slash"]
+    assert usernames(vault_db.fetch_vault_page("alice", search="site02")) == [f"site02{i}" for i in range(5)]
+
+
+def test_vaults_are_separate_per_owner(vault_db):
+    rows = vault_db.fetch_vault_page("bob")
+    assert usernames(rows) == ["site000"]
+    assert vault_db.retrieve_vault_passwords([rows[0][0]]) == {rows[0][0]: "bobs"}
+    assert vault_db.retrieve_vault_passwords([]) == {}
+
+
+def test_model_fetches_pages_and_passwords_lazily(vault_db):
+    pytest.importorskip("PySide6")
+    from PySide6.QtCore import QCoreApplication, Qt
+
+    from client.vault_model import VaultTableModel
+
+    app = QCoreApplication.instance() or QCoreApplication([])  # noqa: F841 (kept alive for the model)
+    model = VaultTableModel("alice", page_size=10)
+    assert model.rowCount() == 10 and model.canFetchMore()
+    assert model.passwords == {}
+
+    assert model.data(model.index(0, 1), Qt.DisplayRole) == "secret0"
+    assert model.data(model.index(0, 0), Qt.DisplayRole) == "site000"
+    assert len(model.passwords) == 10
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 28
+
+    model.set_search("site01")
+    assert [model.data(model.index(row, 0)) for row in range(model.rowCount())] == \
+        [f"site01{i}" for i in range(10)]
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert not model.canFetchMore() and model.rowCount() == 10